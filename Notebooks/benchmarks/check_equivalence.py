@@ -0,0 +1,99 @@
+import numpy as np
+import sys
+
+from pathlib import Path
+
+NOTEBOOK_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(NOTEBOOK_DIR))
+
+""" Mission: Keep the vectorized rewrites numerically equal to the code they replaced.
+Techniques:
+    Seeded random inputs are run through the array implementation and through the original per-item code
+    (sklearn fits, scalar functions), and the results are compared.
+    Commander and Evaluator must agree exactly: the array functions use the same operations in the same order.
+Output: One line per check; exit status 1 if any check fails
+"""
+
+# Hyperparameters
+SEED = 520
+SYMBOLS = 20
+TRADING_DAYS = 5 * 252
+PERIOD_DAYS = [252, 3 * 252, 5 * 252]
+SLOPE_RTOL = 1e-9
+SCORE_VECTORS = 100_000
+
+def random_walks(rng, symbols, days):
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(symbols, days)), axis=1))
+    opens = closes * np.exp(rng.normal(0, 0.005, size=(symbols, days)))
+    # Some symbols have shorter histories, padded with NaN at the start like calculate_linear_regression_scores does
+    for row, missing in enumerate(rng.integers(0, days // 2, size=symbols // 4)):
+        opens[row, :missing] = np.nan
+        closes[row, :missing] = np.nan
+    return opens, closes
+
+def check_trend_slopes(rng):
+    from sklearn.linear_model import LinearRegression
+    from tools.trend import regression_slopes
+
+    opens, closes = random_walks(rng, SYMBOLS, TRADING_DAYS)
+    starts = TRADING_DAYS - np.array(PERIOD_DAYS)
+    slopes = regression_slopes(opens, closes, starts)
+
+    expected = np.empty_like(slopes)
+    for row in range(SYMBOLS):
+        for column, start in enumerate(starts):
+            valid = ~np.isnan(opens[row, start:])
+            model = LinearRegression().fit(opens[row, start:][valid, None], closes[row, start:][valid])
+            expected[row, column] = model.coef_.item()
+
+    error = np.max(np.abs(slopes - expected) / np.abs(expected))
+    return error <= SLOPE_RTOL, f"max relative error {error:.1e} over {slopes.size} fits (tolerance {SLOPE_RTOL:.0e})"
+
+def random_scores(rng, size):
+    # Ranges match the tools: performance, risk and impact in 0-1, sentiment in -1 to +1
+    return rng.random(size), rng.random(size), rng.uniform(-1, 1, size), rng.random(size)
+
+def check_commander_scores(rng):
+    from tools import commander
+
+    scores = random_scores(rng, SCORE_VECTORS)
+    final_scores, verdicts = commander.make_reccomendations(*scores)
+    expected_scores = np.array([commander.calculate_final_score(*row) for row in zip(*scores)])
+    expected_verdicts = np.array([commander.classify_score(score) for score in expected_scores])
+
+    mismatches = np.count_nonzero(final_scores != expected_scores) + np.count_nonzero(verdicts != expected_verdicts)
+    return mismatches == 0, f"{mismatches} mismatches over {SCORE_VECTORS} score vectors (exact)"
+
+def check_evaluator(rng):
+    from tools import evaluator
+
+    scores = random_scores(rng, SCORE_VECTORS)
+    recommendations = rng.choice(["BUY", "HOLD", "AVOID"], size=SCORE_VECTORS)
+    # Push some impact/sentiment pairs past the AVOID thresholds so that branch is exercised too
+    scores[3][::10] = rng.uniform(evaluator.MIN_AVOID_IMPACT, 1, size=len(scores[3][::10]))
+    passes = evaluator.evaluate_many(*scores, recommendations)
+    expected = np.array([evaluator.evaluate(*row) == "PASS" for row in zip(*scores, recommendations)])
+
+    mismatches = np.count_nonzero(passes != expected)
+    return mismatches == 0, f"{mismatches} mismatches over {SCORE_VECTORS} score vectors, {np.count_nonzero(~expected)} failing"
+
+CHECKS = [
+    ("trend slopes vs sklearn", check_trend_slopes),
+    ("commander arrays vs scalar", check_commander_scores),
+    ("evaluator arrays vs scalar", check_evaluator),
+]
+
+def main():
+    failed = False
+    for name, check in CHECKS:
+        try:
+            ok, detail = check(np.random.default_rng(SEED))
+        except ImportError as error:
+            print(f"{name:<32} skipped: {error}")
+            continue
+        failed |= not ok
+        print(f"{name:<32} {'ok  ' if ok else 'FAIL'}  {detail}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import sys
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from time import perf_counter, sleep
+from urllib.parse import parse_qs, urlparse
+
+NOTEBOOK_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(NOTEBOOK_DIR))
+
+""" Mission: Exercise tools.fetch against a real (local) HTTP server instead of a swapped-out session.
+Techniques:
+    A stub server from http.server runs on 127.0.0.1 in a background thread, with endpoints that are slow,
+    that answer 429 a few times before succeeding, and that always fail with 503 or 429.
+    The real pooled Session, urllib3 retry/backoff and per-host semaphores are used; only the module constants are
+    shrunk so the run takes a few seconds.
+Output: One line per check; exit status 1 if any check fails
+"""
+
+# Hyperparameters
+HOST_LIMIT = 2
+SLOW_SECONDS = 0.2
+HANG_SECONDS = 2.0
+READ_TIMEOUT = 0.3
+REJECTIONS = 2
+PAGE = '<html><body><p class="yf-1090901">Stub paragraph.</p></body></html>'
+
+class StubState:
+    def __init__(self):
+        self.lock = Lock()
+        self.active = 0
+        self.max_active = 0
+        self.hits = {}
+
+    def hit(self, path):
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+            return self.hits[path]
+
+state = StubState()
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        hits = state.hit(url.path)
+        if url.path.startswith("/slow"):
+            with state.lock:
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            sleep(SLOW_SECONDS)
+            with state.lock:
+                state.active -= 1
+            self.reply(200, PAGE)
+        elif url.path.startswith("/hang"):
+            sleep(float(parse_qs(url.query).get("seconds", [HANG_SECONDS])[0]))
+            self.reply(200, PAGE)
+        elif url.path.startswith("/flaky"):
+            # Rate limit the first REJECTIONS requests, asking the client to come back immediately
+            if hits <= REJECTIONS:
+                self.reply(429, "Too Many Requests", {"Retry-After": "0"})
+            else:
+                self.reply(200, PAGE)
+        elif url.path.startswith("/error"):
+            self.reply(503, "Service Unavailable")
+        elif url.path.startswith("/limited"):
+            self.reply(429, "Too Many Requests", {"Retry-After": "0"})
+        else:
+            self.reply(404, "Not Found")
+
+    def reply(self, status, body, headers=None):
+        body = body.encode()
+        try:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout check)
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def configure_fetch(fetch, host):
+    # Constants are read when the session and semaphores are built, so reset both after changing them
+    fetch.HOST_LIMITS[host] = HOST_LIMIT
+    fetch.TIMEOUT = (1, READ_TIMEOUT)
+    fetch.BACKOFF_FACTOR = 0.01
+    fetch._session = None
+    fetch._host_semaphores.clear()
+
+def check_host_limit(fetch, base):
+    responses = fetch.fetch_many([f"{base}/slow/{index}" for index in range(4 * HOST_LIMIT)])
+    ok = state.max_active == HOST_LIMIT and all(response.status_code == 200 for response in responses)
+    return ok, f"at most {state.max_active} concurrent requests (limit {HOST_LIMIT})"
+
+def check_timeout(fetch, base):
+    from requests.exceptions import RequestException
+    start = perf_counter()
+    try:
+        fetch.fetch(f"{base}/hang?seconds={HANG_SECONDS}")
+    except RequestException as error:
+        elapsed = perf_counter() - start
+        attempts = state.hits.get("/hang", 0)
+        # Every attempt gives up after READ_TIMEOUT, so all of them together finish before the server would answer once
+        ok = elapsed < HANG_SECONDS and attempts == fetch.RETRIES + 1
+        return ok, f"{type(error).__name__} after {elapsed:.2f}s and {attempts} attempts"
+    return False, "no timeout raised"
+
+def check_retry(fetch, base):
+    response = fetch.fetch(f"{base}/flaky")
+    attempts = state.hits.get("/flaky", 0)
+    ok = response.status_code == 200 and attempts == REJECTIONS + 1
+    return ok, f"status {response.status_code} after {attempts} attempts"
+
+def check_response_error(fetch, base):
+    from tools.chaining import parse_article
+    from tools.errors import YahooResponseError
+    from tools.sentiment import HEADERS, parse_yahoo_finance
+    failures = []
+    for name, parse in [("parse_yahoo_finance", lambda url: parse_yahoo_finance(url, HEADERS)), ("parse_article", parse_article)]:
+        try:
+            parse(f"{base}/error/{name}")
+            failures.append(name)
+        except YahooResponseError:
+            pass
+    attempts = state.hits.get("/error/parse_article", 0)
+    ok = not failures and attempts == fetch.RETRIES + 1
+    return ok, f"YahooResponseError after {attempts} attempts" + (f"; not raised by {', '.join(failures)}" if failures else "")
+
+def check_missing_article(fetch, base):
+    from tools.chaining import fetch_paragraphs
+    from tools.errors import YahooResponseError
+    # A 404, a server error and a hung page are each just a missing article; a persistent 429 is the only failure raised
+    missing = [fetch_paragraphs(f"{base}/{path}") for path in ["gone", "error/missing", f"hang?seconds={HANG_SECONDS}"]]
+    try:
+        fetch_paragraphs(f"{base}/limited")
+        limited = "returned"
+    except YahooResponseError as error:
+        limited = f"raised {error.status_code}"
+    ok = missing == [None, None, None] and limited == "raised 429"
+    return ok, f"failed links gave {missing}; persistent 429 {limited}"
+
+CHECKS = [
+    ("per-host concurrency cap", check_host_limit),
+    ("read timeout", check_timeout),
+    ("429 retry with Retry-After", check_retry),
+    ("non-200 raises YahooResponseError", check_response_error),
+    ("failed link is a missing article", check_missing_article),
+]
+
+def main():
+    from tools import fetch
+    server = start_server()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    configure_fetch(fetch, host)
+
+    failed = False
+    for name, check in CHECKS:
+        try:
+            ok, detail = check(fetch, f"http://{host}")
+        except ImportError as error:
+            print(f"{name:<36} skipped: {error}")
+            continue
+        failed |= not ok
+        print(f"{name:<36} {'ok  ' if ok else 'FAIL'}  {detail}")
+
+    server.shutdown()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+
+from pathlib import Path
+
+""" Mission: Compare two benchmark reports and flag the stages that got slower.
+Techniques:
+    Stages are matched on (stage, symbol, batch size) and compared on their median time.
+    A stage slower than the baseline by more than THRESHOLD (and by more than MIN_SECONDS) counts as a regression.
+Output: A table of baseline vs candidate medians; exit status 1 if anything regressed
+"""
+
+# Hyperparameters
+THRESHOLD = 1.25
+MIN_SECONDS = 0.001
+
+def load_results(path):
+    report = json.loads(Path(path).read_text())
+    return {
+        (result["stage"], result["symbol"], result["batch_size"]): result["median_seconds"]
+        for result in report["results"]
+        if result["median_seconds"] is not None
+    }
+
+def compare(baseline, candidate, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda key: tuple(str(part) for part in key)):
+        before, after = baseline[key], candidate[key]
+        ratio = after / before if before > 0 else float("inf")
+        regressed = ratio > threshold and after - before > min_seconds
+        rows.append((*key, before, after, ratio, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a benchmark report against a baseline report.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    arguments = parser.parse_args()
+
+    rows = compare(load_results(arguments.baseline), load_results(arguments.candidate), arguments.threshold)
+    print(f"{'stage':<24} {'symbol':<6} {'batch':<7} {'baseline ms':>12} {'candidate ms':>13} {'ratio':>7}")
+    for stage, symbol, batch_size, before, after, ratio, regressed in rows:
+        print(f"{stage:<24} {symbol or '':<6} {batch_size or '':<7} {before * 1000:12.2f} {after * 1000:13.2f} {ratio:7.2f}"
+              + ("  REGRESSED" if regressed else ""))
+    sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+if __name__ == "__main__":
+    main()
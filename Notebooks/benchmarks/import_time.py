@@ -0,0 +1,85 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+from pathlib import Path
+
+""" Mission: Keep `import tools.<module>` fast enough for short-lived CLI and batch-worker processes.
+Techniques:
+    Each module is imported in a fresh interpreter with -X importtime; its cumulative import time is compared to a budget.
+    The same interpreter reports which heavy libraries ended up in sys.modules; none of them may load at import time.
+Output: A table of import times per module; exit status 1 if a budget is exceeded or a heavy library is imported eagerly
+"""
+
+# Hyperparameters
+NOTEBOOK_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_SECONDS = 1.0
+BUDGET_SECONDS = {
+    "tools": 0.05,
+    "tools.commander": 1.5,
+    "tools.evaluator": 1.5,
+    "tools.pipeline": 2.0,
+    "tools.screener": 2.0,
+}
+MODULES = [
+    "tools",
+    "tools.chaining",
+    "tools.commander",
+    "tools.evaluator",
+    "tools.impact",
+    "tools.performance",
+    "tools.risk",
+    "tools.sentiment",
+    "tools.pipeline",
+    "tools.screener",
+    "tools.optimizer",
+]
+HEAVY_MODULES = ["transformers", "torch", "gluonts", "alpha_vantage", "yfinance", "sklearn", "bs4", "vaderSentiment"]
+
+PROBE = "import json, sys, {module}; print(json.dumps(sorted(name for name in {heavy} if name in sys.modules)))"
+
+def measure(module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=NOTEBOOK_DIR, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        return {"module": module, "error": process.stderr.strip().splitlines()[-1]}
+
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    cumulative = 0
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$", line)
+        if match and match.group(2) == module:
+            cumulative = int(match.group(1))
+    return {"module": module, "seconds": cumulative / 1e6, "heavy": json.loads(process.stdout)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time budgets for the tools package.")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--output", type=Path, default=None)
+    arguments = parser.parse_args()
+
+    failed = False
+    results = []
+    for module in arguments.modules:
+        result = measure(module)
+        results.append(result)
+        if "error" in result:
+            print(f"{module:<22} {'':>10}  skipped: {result['error']}")
+            continue
+        budget = BUDGET_SECONDS.get(module, DEFAULT_BUDGET_SECONDS)
+        over = result["seconds"] > budget or result["heavy"]
+        failed |= bool(over)
+        print(f"{module:<22} {result['seconds'] * 1000:8.1f} ms  (budget {budget * 1000:.0f} ms)"
+              + (f"  heavy: {', '.join(result['heavy'])}" if result["heavy"] else "")
+              + ("  OVER" if over else ""))
+
+    if arguments.output is not None:
+        arguments.output.write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import csv
+import json
+import random
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+""" Mission: Generate the offline fixtures the benchmarks replay instead of calling live APIs.
+Techniques:
+    Standard library only, seeded, so the same fixtures come out on every machine.
+    Everything is synthetic (nothing is recorded from the live services): prices are random walks, and the article pages
+    are short stubs with the same yf-1090901 paragraph markup as Yahoo Finance, far smaller than real pages.
+    Daily OHLCV histories in the shape of a yfinance history frame, one CSV per symbol.
+    Alpha Vantage 60min intraday payloads, NewsAPI "everything" responses and Yahoo Finance article pages.
+Output: Files under benchmarks/data
+"""
+
+# Hyperparameters
+DATA_DIR = Path(__file__).resolve().parent / "data"
+SYMBOLS = {"AAPL": 190.0, "MSFT": 410.0, "SPY": 520.0}
+TRADING_DAYS = 5 * 252
+INTRADAY_DAYS = 45
+ARTICLES_PER_SYMBOL = 100
+ARTICLE_PAGES = 24
+END_DATE = date(2025, 10, 17)
+SEED = 520
+
+SENTENCES = [
+    "{name} shares rallied after the company beat earnings expectations and raised guidance.",
+    "Analysts upgraded {name}, citing strong growth in services revenue and record margins.",
+    "{name} stock slumped as regulators opened an investigation into its business practices.",
+    "Investors worry that weak demand and rising costs will hurt {name} profits next quarter.",
+    "{name} announced a new product line, which will be available later this year.",
+    "The board of {name} declared a quarterly dividend, in line with the previous payment.",
+    "{name} faces a lawsuit over alleged patent infringement, and shares fell in early trading.",
+    "Strong buybacks and solid cash flow keep {name} attractive to long-term investors.",
+    "{name} executives will present at an industry conference next week.",
+    "Supply chain disruptions and a downgrade sent {name} to its lowest close in months.",
+    "{name} reported revenue roughly flat from a year earlier as markets await the Fed decision.",
+    "Record demand for {name} products lifted the outlook, analysts said.",
+]
+
+def write_history(rng, symbol, start_price):
+    # Business days ending on END_DATE; the benchmark re-anchors them to the day it runs
+    days = []
+    day = END_DATE
+    while len(days) < TRADING_DAYS:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    days.reverse()
+
+    price = start_price
+    with open(DATA_DIR / "history" / f"{symbol}.csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Open", "High", "Low", "Close", "Volume"])
+        for day in days:
+            open_price = price * (1 + rng.gauss(0, 0.004))
+            price = open_price * (1 + rng.gauss(0.0004, 0.015))
+            high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.004)))
+            low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.004)))
+            volume = int(rng.uniform(2e7, 9e7))
+            writer.writerow([day.isoformat(), f"{open_price:.4f}", f"{high:.4f}", f"{low:.4f}", f"{price:.4f}", volume])
+
+def write_intraday(rng, symbol, start_price):
+    # Newest first, like Alpha Vantage returns it
+    series = {}
+    price = start_price
+    timestamps = []
+    for offset in range(INTRADAY_DAYS, 0, -1):
+        day = datetime.combine(END_DATE - timedelta(days=offset), datetime.min.time())
+        timestamps.extend(day + timedelta(hours=hour) for hour in range(4, 20))
+    for timestamp in timestamps:
+        open_price = price
+        price = open_price * (1 + rng.gauss(0, 0.003))
+        series[timestamp.strftime("%Y-%m-%d %H:%M:%S")] = {
+            "1. open": f"{open_price:.4f}",
+            "2. high": f"{max(open_price, price) * 1.001:.4f}",
+            "3. low": f"{min(open_price, price) * 0.999:.4f}",
+            "4. close": f"{price:.4f}",
+            "5. volume": str(int(rng.uniform(1e5, 5e6))),
+        }
+    payload = {
+        "Meta Data": {"2. Symbol": symbol, "4. Interval": "60min", "5. Output Size": "Full size"},
+        "Time Series (60min)": dict(reversed(list(series.items()))),
+    }
+    (DATA_DIR / "alpha_vantage" / f"{symbol}.json").write_text(json.dumps(payload))
+
+def write_news(rng, symbol):
+    articles = []
+    for index in range(ARTICLES_PER_SYMBOL):
+        published = datetime.combine(END_DATE, datetime.min.time()) - timedelta(hours=index * 6)
+        # Syndicated copies share a description, as they do on NewsAPI
+        description = rng.choice(SENTENCES).format(name=symbol)
+        articles.append({
+            "source": {"id": None, "name": "Yahoo Entertainment"},
+            "title": f"{symbol} market update {index}",
+            "description": description,
+            "url": f"https://finance.yahoo.com/news/{symbol.lower()}-market-update-{index}.html",
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    payload = {"status": "ok", "totalResults": len(articles), "articles": articles}
+    (DATA_DIR / "newsapi" / f"{symbol}.json").write_text(json.dumps(payload))
+
+def write_article_pages(rng):
+    for page in range(ARTICLE_PAGES):
+        paragraphs = [rng.choice(SENTENCES).format(name="The company") for _ in range(rng.randint(6, 14))]
+        body = "\n".join(f'<p class="yf-1090901">{paragraph}</p>' for paragraph in paragraphs)
+        html = f'<html><head><title>Article {page}</title></head><body><div class="body">\n{body}\n</div></body></html>\n'
+        (DATA_DIR / "articles" / f"{page}.html").write_text(html)
+
+def main():
+    rng = random.Random(SEED)
+    for directory in ["history", "alpha_vantage", "newsapi", "articles"]:
+        (DATA_DIR / directory).mkdir(parents=True, exist_ok=True)
+    for symbol, start_price in SYMBOLS.items():
+        write_history(rng, symbol, start_price)
+        write_intraday(rng, symbol, start_price)
+        write_news(rng, symbol)
+    write_article_pages(rng)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import json
+import numpy as np
+import pandas as pd
+import re
+import zlib
+
+from datetime import date, datetime, timezone
+from importlib import import_module
+from pathlib import Path
+
+""" Mission: Point every tool at the synthetic fixtures instead of live APIs.
+Techniques:
+    The shared fetch session is replaced by one that answers NewsAPI and Yahoo Finance URLs from benchmarks/data.
+    Fixture dates are re-anchored to the present (news up to the moment the session was created, price bars up to the
+    last business day), and NewsAPI's from / sortBy parameters are honoured, so incremental runs see a real delta.
+    yfinance's Ticker and Alpha Vantage's TimeSeries are replaced through the tools' open_ticker / intraday_client hooks.
+    FinBERT is replaced, through models.register_loader, by a tiny hashed bag-of-words classifier with the same interface.
+    Every store the tools write to is moved into a scratch directory, and the rate limits are lifted.
+Output: install() patches the tools in place and returns the names of modules that could not be imported
+"""
+
+# Hyperparameters
+DATA_DIR = Path(__file__).resolve().parent / "data"
+STAND_IN_DIMENSIONS = 1024
+STAND_IN_SEED = 520
+
+POSITIVE_WORDS = ["beat", "raised", "upgraded", "strong", "growth", "record", "rallied", "lifted", "solid", "attractive"]
+NEGATIVE_WORDS = ["slumped", "investigation", "worry", "weak", "hurt", "lawsuit", "fell", "disruptions", "downgrade", "lowest"]
+
+class FixtureResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+
+    def json(self):
+        return json.loads(self.text)
+
+class FixtureSession:
+    def __init__(self):
+        # Fixed per session, so repeated calls within one run see the same publish times
+        self.anchor = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        if "newsapi.org" in url:
+            return self.news_page(params or {})
+        if "finance.yahoo.com" in url:
+            # Each article URL ends in a number; articles share the fixture pages round robin
+            number = re.search(r"(\d+)\D*$", url)
+            pages = sorted((DATA_DIR / "articles").glob("*.html"))
+            page = pages[int(number.group(1)) % len(pages)] if number else pages[0]
+            return FixtureResponse(200, page.read_text())
+        return FixtureResponse(404, "")
+
+    def news_page(self, params):
+        path = DATA_DIR / "newsapi" / f"{params.get('q', '').upper()}.json"
+        if not path.exists():
+            return FixtureResponse(200, json.dumps({"status": "ok", "totalResults": 0, "articles": []}))
+        body = json.loads(path.read_text())
+        articles = body["articles"]
+        published = pd.to_datetime([article["publishedAt"] for article in articles], utc=True)
+        # Shift every article by the same amount so the newest one was published when the session was created
+        published = published + (pd.Timestamp(self.anchor) - published.max())
+        for article, timestamp in zip(articles, published):
+            article["publishedAt"] = timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if "from" in params:
+            # NewsAPI reads a from date without an offset as UTC, and includes articles published at that moment
+            start = pd.Timestamp(params["from"])
+            start = start.tz_localize("UTC") if start.tzinfo is None else start
+            articles = [article for article, timestamp in zip(articles, published) if timestamp >= start]
+        if params.get("sortBy") == "publishedAt":
+            articles = sorted(articles, key=lambda article: article["publishedAt"], reverse=True)
+
+        page_size = int(params.get("pageSize", 100))
+        first = (int(params.get("page", 1)) - 1) * page_size
+        body["totalResults"] = len(articles)
+        body["articles"] = articles[first:first + page_size]
+        return FixtureResponse(200, json.dumps(body))
+
+class FixtureTicker:
+    def __init__(self, symbol):
+        self.symbol = symbol.upper()
+
+    def history(self, period=None, start=None):
+        frame = pd.read_csv(DATA_DIR / "history" / f"{self.symbol}.csv", index_col="Date")
+        # Re-anchor the fixture bars so the last one is the most recent business day
+        frame.index = pd.bdate_range(end=pd.Timestamp(date.today()) - pd.offsets.BDay(1), periods=len(frame), name="Date")
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+        return frame
+
+class FixtureTimeSeries:
+    def __init__(self, key=None, output_format="pandas", indexing_type="date"):
+        pass
+
+    def get_intraday(self, symbol, interval="60min", outputsize="full"):
+        payload = json.loads((DATA_DIR / "alpha_vantage" / f"{symbol.upper()}.json").read_text())
+        series = payload[f"Time Series ({interval})"]
+        frame = pd.DataFrame.from_dict(series, orient="index").astype(float)
+        frame.index = pd.DatetimeIndex(frame.index, name="date")
+        return frame, payload["Meta Data"]
+
+def bucket(token):
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(token.encode()) % STAND_IN_DIMENSIONS
+
+class StandInClassifier:
+    labels = ["positive", "neutral", "negative"]
+
+    def __init__(self):
+        rng = np.random.default_rng(STAND_IN_SEED)
+        self.weights = rng.normal(scale=0.01, size=(STAND_IN_DIMENSIONS, len(self.labels)))
+        self.weights[[bucket(word) for word in POSITIVE_WORDS], 0] += 1
+        self.weights[[bucket(word) for word in NEGATIVE_WORDS], 2] += 1
+        self.weights[:, 1] += 0.05
+
+    def __call__(self, inputs, batch_size=None, **kwargs):
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        features = np.zeros((len(inputs), STAND_IN_DIMENSIONS))
+        for row, text in enumerate(inputs):
+            for token in re.findall(r"[a-z]+", text.lower()):
+                features[row, bucket(token)] += 1
+        logits = features @ self.weights
+        probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [{"label": self.labels[label], "score": float(probabilities[row, label])} for row, label in enumerate(best)]
+
+def patch(module_name, unavailable, **attributes):
+    try:
+        module = import_module(module_name)
+    except ImportError as error:
+        unavailable[module_name] = repr(error)
+        return None
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    return module
+
+def install(scratch_dir):
+    scratch_dir = Path(scratch_dir)
+    unavailable = {}
+    patch("tools.fetch", unavailable, _session=FixtureSession())
+    patch("tools.market_data", unavailable, open_ticker=FixtureTicker, STORE_DIR=scratch_dir / "market")
+    patch("tools.forecast", unavailable, intraday_client=FixtureTimeSeries, MODEL_DIR=scratch_dir / "deepar")
+    patch("tools.article_cache", unavailable, CACHE_PATH=scratch_dir / "articles.sqlite")
+    patch("tools.history", unavailable, HISTORY_PATH=scratch_dir / "runs.sqlite")
+    patch("tools.screener", unavailable, CHECKPOINT_DIR=scratch_dir / "screens")
+
+    limits = patch("tools.limits", unavailable)
+    if limits is not None:
+        for api in list(limits.RATE_LIMITS):
+            limits.configure(api, 10**9, 1)
+
+    models = patch("tools.models", unavailable)
+    if models is not None:
+        models.register_loader(models.FINBERT_MODEL, StandInClassifier)
+    return unavailable
@@ -0,0 +1,210 @@
+import argparse
+import json
+import numpy as np
+import platform
+import subprocess
+import sys
+import tempfile
+
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+from statistics import mean, median
+from time import perf_counter
+
+NOTEBOOK_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(NOTEBOOK_DIR))
+
+import offline
+
+""" Mission: Time every stage of every tool offline, per symbol and per batch size.
+Techniques:
+    The tools run against the synthetic fixtures in benchmarks/data (see offline.py); no API keys or network needed.
+    The article pages are short stubs, so parsing timings are a relative measure only, and the report says so.
+    Each stage is repeated and reported as min / median / mean wall-clock seconds.
+    Tool modules are imported inside the stages, so a missing dependency only skips the stages that need it.
+Output: JSON report (benchmarks/reports/<commit>.json by default), to be compared with compare.py
+"""
+
+# Hyperparameters
+REPORT_DIR = Path(__file__).resolve().parent / "reports"
+SYMBOLS = ["AAPL", "MSFT", "SPY"]
+BATCH_SIZES = [8, 32, 128]
+SCORING_BATCH_SIZES = [1, 100, 10_000]
+REPEATS = 5
+ARTICLE_LIMIT = 100
+API_KEY = "fixture"
+
+def record(results, stage, durations, status="ok", **labels):
+    results.append({
+        "stage": stage,
+        "symbol": labels.get("symbol"),
+        "batch_size": labels.get("batch_size"),
+        "status": status,
+        "repeats": len(durations),
+        "min_seconds": min(durations) if durations else None,
+        "median_seconds": median(durations) if durations else None,
+        "mean_seconds": mean(durations) if durations else None,
+    })
+    print(f"{stage:<24} {labels.get('symbol') or '':<6} {labels.get('batch_size') or '':<7} "
+          + (f"{median(durations) * 1000:10.2f} ms" if durations else status))
+
+def skipped(error):
+    return f"skipped: {type(error).__name__}: {error}"
+
+def measure(results, stage, function, repeats=REPEATS, setup=None, **labels):
+    durations = []
+    status = "ok"
+    for _ in range(repeats):
+        try:
+            if setup is not None:
+                setup()
+            start = perf_counter()
+            function()
+            durations.append(perf_counter() - start)
+        except Exception as error:
+            status = skipped(error)
+            break
+    record(results, stage, durations, status, **labels)
+
+def market_stages(results, symbol, repeats):
+    def forget_symbol():
+        market_data = import_module("tools.market_data")
+        market_data._refreshed.pop(symbol, None)
+        market_data._loaded.pop(symbol, None)
+        for path in market_data.symbol_dir(symbol).glob("*"):
+            path.unlink()
+
+    def read_periods():
+        return [import_module("tools.market_data").get_history(symbol, period) for period in ["1y", "3y", "5y"]]
+
+    measure(results, "market.fetch", lambda: import_module("tools.market_data").get_history(symbol, "5y"), repeats, setup=forget_symbol, symbol=symbol)
+    measure(results, "market.read", read_periods, repeats, symbol=symbol)
+
+def performance_stages(results, symbol, repeats):
+    def regression():
+        performance = import_module("tools.performance")
+        return performance.calculate_linear_regression_scores([performance.ticker_history(symbol, period) for period in ["1y", "3y", "5y"]])
+
+    def sma():
+        performance = import_module("tools.performance")
+        return performance.calculate_sma_scores(performance.ticker_history(symbol, "5y")["Close"])
+
+    measure(results, "performance.regression", regression, repeats, symbol=symbol)
+    measure(results, "performance.sma", sma, repeats, symbol=symbol)
+    # DeepAR trains on the spot when no global model is stored, so one repeat is plenty
+    measure(results, "performance.forecast", lambda: import_module("tools.performance").calculate_armia_score(API_KEY, symbol), 1, symbol=symbol)
+
+def risk_stages(results, symbol, repeats):
+    measure(results, "risk.score", lambda: import_module("tools.risk").calculate_risk(symbol), repeats, symbol=symbol)
+
+def sentiment_stages(results, symbol, repeats, batch_sizes, article_limit):
+    try:
+        sentiment = import_module("tools.sentiment")
+    except ImportError as error:
+        record(results, "news.fetch", [], skipped(error), symbol=symbol)
+        return
+    # The inputs are built under the same guard as the stages, so a missing parser (bs4) only skips what needs it
+    try:
+        news = sentiment.call_news_api(API_KEY, symbol, "30d", limit=article_limit)
+    except Exception as error:
+        record(results, "news.fetch", [], skipped(error), symbol=symbol)
+        return
+    urls = list(news["url"])
+    try:
+        articles = [sentiment.parse_yahoo_finance(url, sentiment.HEADERS) for url in urls]
+        articles_error = None
+    except Exception as error:
+        articles, articles_error = None, error
+
+    measure(results, "news.fetch", lambda: sentiment.call_news_api(API_KEY, symbol, "30d", limit=article_limit), repeats, symbol=symbol)
+    measure(results, "vader.score", lambda: sentiment.score_many(news["description"]), repeats, symbol=symbol)
+    measure(results, "article.parse", lambda: [sentiment.parse_yahoo_finance(url, sentiment.HEADERS) for url in urls], repeats, symbol=symbol)
+
+    models = import_module("tools.models")
+    measure(results, "model.load", models.get_pipeline, repeats, setup=models.unload, symbol=symbol)
+    for batch_size in batch_sizes:
+        if articles_error is not None:
+            record(results, "model.inference", [], skipped(articles_error), symbol=symbol, batch_size=batch_size)
+            continue
+        measure(
+            results, "model.inference",
+            lambda: models.classify_articles(articles, batch_size=batch_size),
+            repeats, symbol=symbol, batch_size=batch_size,
+        )
+    measure(
+        results, "sentiment.score",
+        lambda: sentiment.calculate_sentiment_score(API_KEY, symbol, limit=article_limit),
+        repeats, symbol=symbol,
+    )
+
+    measure(results, "chaining.preprocess", lambda: import_module("tools.chaining").preprocess(urls), repeats, symbol=symbol)
+    if articles_error is not None:
+        record(results, "chaining.classify", [], skipped(articles_error), symbol=symbol)
+        return
+    measure(results, "chaining.classify", lambda: import_module("tools.chaining").classify(articles), repeats, symbol=symbol)
+
+def scoring_stages(results, repeats, batch_sizes):
+    rng = np.random.default_rng(520)
+    for batch_size in batch_sizes:
+        performance, risk, sentiment, impact = rng.uniform(-1, 1, size=(4, batch_size))
+
+        def recommend():
+            return import_module("tools.commander").make_reccomendations(performance, risk, sentiment, impact)
+
+        def evaluate():
+            _, verdicts = recommend()
+            return import_module("tools.evaluator").evaluate_many(performance, risk, sentiment, impact, verdicts)
+
+        measure(results, "commander.scoring", recommend, repeats, batch_size=batch_size)
+        measure(results, "evaluator.scoring", evaluate, repeats, batch_size=batch_size)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=NOTEBOOK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(symbols=SYMBOLS, batch_sizes=BATCH_SIZES, scoring_batch_sizes=SCORING_BATCH_SIZES, repeats=REPEATS, article_limit=ARTICLE_LIMIT):
+    results = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        unavailable = offline.install(scratch_dir)
+        for symbol in symbols:
+            market_stages(results, symbol, repeats)
+            performance_stages(results, symbol, repeats)
+            risk_stages(results, symbol, repeats)
+            sentiment_stages(results, symbol, repeats, batch_sizes, article_limit)
+        scoring_stages(results, repeats, scoring_batch_sizes)
+
+    return {
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "repeats": repeats,
+        "fixtures": "synthetic",
+        "unavailable": unavailable,
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline tool benchmarks and write a JSON report.")
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--scoring-batch-sizes", nargs="+", type=int, default=SCORING_BATCH_SIZES)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--article-limit", type=int, default=ARTICLE_LIMIT)
+    parser.add_argument("--output", type=Path, default=None)
+    arguments = parser.parse_args()
+
+    report = run(arguments.symbols, arguments.batch_sizes, arguments.scoring_batch_sizes, arguments.repeats, arguments.article_limit)
+    output = arguments.output or REPORT_DIR / f"{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from importlib import import_module
+
+""" Mission: Make `import tools` cheap; submodules and their dependencies load on first use.
+Techniques:
+    Module-level __getattr__ (PEP 562) imports a submodule the first time it is accessed as tools.<name>.
+    Heavy libraries (transformers, gluonts/torch, yfinance, alpha_vantage, bs4, vaderSentiment) are imported
+    inside the functions that need them; benchmarks/import_time.py checks this stays true.
+Output: The tools package
+"""
+
+SUBMODULES = [
+    "article_cache",
+    "chaining",
+    "commander",
+    "dedup",
+    "errors",
+    "evaluator",
+    "fetch",
+    "forecast",
+    "history",
+    "impact",
+    "indicators",
+    "instrument",
+    "limits",
+    "llm_cache",
+    "market_data",
+    "models",
+    "optimizer",
+    "orchestration",
+    "performance",
+    "pipeline",
+    "risk",
+    "screener",
+    "sentiment",
+    "trend",
+    "utils",
+]
+
+# Modules whose tools are handed to the agents
+TOOL_MODULES = ["chaining", "commander", "evaluator", "impact", "performance", "risk", "sentiment"]
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted([*globals(), *SUBMODULES])
+
+def all_tools():
+    return [tool for name in TOOL_MODULES for tool in import_module(f".{name}", __name__).tools]
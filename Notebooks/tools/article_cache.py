@@ -0,0 +1,189 @@
+import json
+
+from hashlib import sha256
+from requests.exceptions import RequestException
+from threading import Lock
+from time import time
+
+from .errors import YahooResponseError
+from .instrument import count
+from .models import FINBERT_MODEL, classify_articles
+from .utils import CACHE_DIR, open_store
+
+""" Mission: Keep fetched articles and their FinBERT labels between runs.
+Techniques:
+    URLs map to a content hash, and each distinct article body (the yf-1090901 paragraphs) is stored once under that hash.
+    URL entries expire after TTL_SECONDS. Beyond MAX_ENTRIES, the least recently used articles are evicted.
+    FinBERT labels are stored per content hash and model, so re-scoring a ticker only classifies articles it has not seen.
+    A page that cannot be fetched (dead link, timeout, error status) is a missing article (None), not a failed run;
+    only a rate limit that outlasts the fetch layer's retries is raised.
+Output: Paragraph lists, sentiment labels and hit/miss counters
+"""
+
+# Hyperparameters
+RATE_LIMITED = 429
+CACHE_PATH = CACHE_DIR / "articles.sqlite"
+TTL_SECONDS = 7 * 24 * 60 * 60
+MAX_ENTRIES = 10_000
+EVICT_EVERY = 100
+
+_lock = Lock()
+_connection = None
+_writes = 0
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "label_hits": 0,
+    "label_misses": 0,
+    "evictions": 0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contents (
+    content_hash TEXT PRIMARY KEY,
+    paragraphs TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    content_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    label INTEGER NOT NULL,
+    PRIMARY KEY (content_hash, model)
+);
+CREATE INDEX IF NOT EXISTS urls_content_hash ON urls (content_hash);
+CREATE INDEX IF NOT EXISTS contents_accessed_at ON contents (accessed_at);
+"""
+
+def content_hash(paragraphs):
+    if isinstance(paragraphs, str):
+        paragraphs = [paragraphs]
+    return sha256("\n".join(paragraphs).encode("utf-8")).hexdigest()
+
+def get_connection():
+    global _connection
+    if _connection is None:
+        _connection = open_store(CACHE_PATH, SCHEMA)
+        evict(_connection)
+    return _connection
+
+def evict(connection):
+    with connection:
+        expired = connection.execute("DELETE FROM urls WHERE fetched_at < ?", (time() - TTL_SECONDS,)).rowcount
+
+        # Keep only the most recently used MAX_ENTRIES bodies
+        overflow = connection.execute(
+            "SELECT content_hash FROM contents ORDER BY accessed_at DESC LIMIT -1 OFFSET ?", (MAX_ENTRIES,)
+        ).fetchall()
+        connection.executemany("DELETE FROM urls WHERE content_hash = ?", overflow)
+
+        orphaned = connection.execute(
+            "DELETE FROM contents WHERE content_hash NOT IN (SELECT content_hash FROM urls)"
+        ).rowcount
+        connection.execute("DELETE FROM labels WHERE content_hash NOT IN (SELECT content_hash FROM contents)")
+    _stats["evictions"] += expired + orphaned
+
+def get_article(url):
+    with _lock:
+        connection = get_connection()
+        row = connection.execute(
+            "SELECT c.content_hash, c.paragraphs FROM urls u JOIN contents c ON c.content_hash = u.content_hash "
+            "WHERE u.url = ? AND u.fetched_at >= ?",
+            (url, time() - TTL_SECONDS),
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            count("cache_misses")
+            return None
+        _stats["hits"] += 1
+        count("cache_hits")
+        with connection:
+            connection.execute("UPDATE contents SET accessed_at = ? WHERE content_hash = ?", (time(), row[0]))
+        return json.loads(row[1])
+
+def put_article(url, paragraphs):
+    global _writes
+    digest = content_hash(paragraphs)
+    now = time()
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                "INSERT INTO contents (content_hash, paragraphs, accessed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (content_hash) DO UPDATE SET accessed_at = excluded.accessed_at",
+                (digest, json.dumps(paragraphs), now),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO urls (url, content_hash, fetched_at) VALUES (?, ?, ?)", (url, digest, now)
+            )
+        _writes += 1
+        if _writes % EVICT_EVERY == 0:
+            evict(connection)
+    return digest
+
+def get_or_fetch(url, fetch_function):
+    paragraphs = get_article(url)
+    if paragraphs is None:
+        try:
+            paragraphs = fetch_function(url)
+        except RequestException:
+            count("fetch_failures")
+            return None
+        except YahooResponseError as error:
+            if error.status_code == RATE_LIMITED:
+                raise
+            count("fetch_failures")
+            return None
+        # An empty body is usually a blocked or error page; fetch it again next time rather than caching it for TTL_SECONDS
+        if paragraphs:
+            put_article(url, paragraphs)
+    return paragraphs
+
+def get_labels(digests, model_name=FINBERT_MODEL):
+    if not digests:
+        return {}
+    with _lock:
+        connection = get_connection()
+        placeholders = ", ".join("?" * len(digests))
+        rows = connection.execute(
+            f"SELECT content_hash, label FROM labels WHERE model = ? AND content_hash IN ({placeholders})",
+            (model_name, *digests),
+        ).fetchall()
+    return dict(rows)
+
+def put_labels(labels, model_name=FINBERT_MODEL):
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO labels (content_hash, model, label) VALUES (?, ?, ?)",
+                [(digest, model_name, int(label)) for digest, label in labels.items()],
+            )
+
+def classify_with_cache(articles, model_name=FINBERT_MODEL):
+    digests = [content_hash(article) if article else None for article in articles]
+    known = get_labels(list({digest for digest in digests if digest}), model_name)
+
+    missing = [index for index, digest in enumerate(digests) if digest and digest not in known]
+    hits = sum(1 for digest in digests if digest in known)
+    with _lock:
+        _stats["label_hits"] += hits
+        _stats["label_misses"] += len(missing)
+    count("label_cache_hits", hits)
+    count("label_cache_misses", len(missing))
+
+    if missing:
+        new_labels = classify_articles([articles[index] for index in missing], model_name=model_name)
+        fresh = {digests[index]: label for index, label in zip(missing, new_labels)}
+        put_labels(fresh, model_name)
+        known.update(fresh)
+
+    return [int(known[digest]) if digest else 0 for digest in digests]
+
+def get_stats():
+    with _lock:
+        return dict(_stats)
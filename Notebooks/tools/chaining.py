@@ -1,20 +1,21 @@
-import pandas as pd
+import numpy as np
 
-from bs4 import BeautifulSoup
-from transformers import pipeline
-from requests import get
 from smolagents import tool
-from sys import modules
 from textwrap import dedent
-from yfinance import Search
 
-from .utils import get_tool_names
+from .article_cache import classify_with_cache, get_or_fetch
+from .dedup import article_groups
+from .errors import YahooResponseError
+from .fetch import HEADERS, fetch, run_concurrently
+from .limits import throttle
+from .utils import get_tools, register_tool
 
 """ Author: Johnathan Kelsey
 Mission: Offer multiple tools to demonstrate prompt chaining
 Output: Tool Dependent
 """
 
+@register_tool
 @tool
 def retrieve_article_links(instrument:str) -> list[str]:
     """Perfomrs a quick search on the financial instrument provided and returns a list of URLs to links about the instrument.
@@ -25,15 +26,31 @@ def retrieve_article_links(instrument:str) -> list[str]:
     Returns:
         List(String): A list of URLs linking to articles about the financial instrument.
     """
+    from yfinance import Search
+    throttle("yahoo")
     search = Search(instrument)
     urls = set()
     for article in search.news:
         urls.add(article["link"])
     return list(urls)
 
+def parse_article(url):
+    response = fetch(url, headers=HEADERS)
+    if response.status_code != 200:
+        raise YahooResponseError(response.status_code)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(response.text, "html.parser")
+
+    parts = soup.find_all("p", class_="yf-1090901")
+    return [part.get_text() for part in parts]
+
+def fetch_paragraphs(url):
+    return get_or_fetch(url, parse_article)
+
+@register_tool
 @tool
 def preprocess(urls:list[str]) -> list[str]:
-    """Uses a list of URLs to fetch news article data and returns a list of all articles found.
+    """Uses a list of URLs to fetch news article data and returns a list of all articles found. Links that cannot be fetched are left out.
 
     Args:
         urls (list[string]): The list of article links.
@@ -41,49 +58,34 @@ def preprocess(urls:list[str]) -> list[str]:
     Returns:
         List(String): A list of articles.
     """
-    full_articles = []
-    headers = {
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0"
-    }
-
-    for url in urls:
-        response = get(url, headers=headers)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        parts = soup.find_all("p", class_="yf-1090901")
-        full_article = [part.get_text() for part in parts]
-        full_articles.append(full_article)
-
-    return full_articles
+    try:
+        articles = run_concurrently(fetch_paragraphs, urls)
+    except YahooResponseError:
+        # Only raised for a rate limit that outlasted the retries; other failed links come back as None
+        return dedent("""
+                      Yahoo returned an error.  The most likely cause for this is rate limiting.  Give it a few seconds before you attempt the next yahoo call.
+                      """)
+    return [article for article in articles if article is not None]
 
 
+@register_tool
 @tool
 def classify(articles: list[str]) -> list[int]:
-    """Classify the sentiment of each article using BERT.
+    """Classify the sentiment of each distinct story using BERT. Near-duplicate (syndicated) copies of the same story are classified and counted once, so the list can be shorter than the input.
 
     Args:
         articles (list[str]): A list of articles to clasify.
 
     Returns:
-        List(Integer): A list of integers indicating the sentiment of each article.
+        List(Integer): A list of integers indicating the sentiment of each distinct story, in order of first appearance.
     """
-    pipe = pipeline("text-classification", model="ProsusAI/finbert", max_length=512, truncation=True)
-
-    sentiment_scores = []
-    for article in articles:
-        bert_df = pd.DataFrame(pipe(article))
-        sentiment = bert_df.label.value_counts().nlargest(1).index[0]
-        if sentiment == "positive":
-            sentiment_scores.append(1)
-        elif sentiment == "neutral":
-            sentiment_scores.append(0)
-        else:
-            sentiment_scores.append(-1)
-
-    return sentiment_scores
+    # Only the first copy of each story is classified, so syndicated articles do not outvote the rest
+    groups = article_groups(articles)
+    representatives = np.flatnonzero(groups == np.arange(len(groups)))
+    return [int(label) for label in classify_with_cache([articles[index] for index in representatives])]
     
 
+@register_tool
 @tool
 def extract(sentiment_scores: list[int]) -> dict:
     """Calculate a set of statistics based on the provided sentiment scores.
@@ -101,6 +103,7 @@ def extract(sentiment_scores: list[int]) -> dict:
         "neg": sentiment_scores.count(-1),
     }
 
+@register_tool
 @tool
 def summarize(stats:dict) -> str:
     """Summarize the statistics provided
@@ -129,5 +132,4 @@ def summarize(stats:dict) -> str:
                   """)
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
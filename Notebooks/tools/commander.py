@@ -1,7 +1,8 @@
+import numpy as np
+
 from smolagents import tool
-from sys import modules
 
-from .utils import get_tool_names
+from .utils import get_tools, register_tool
 
 """ Author: Johnathan Kelsey
 Mission: Synthesize all agent outputs and deliver final classification.
@@ -27,9 +28,39 @@ BUY_THRESHOLD = 0.55
 HOLD_THRESHOLD = 0.5
 assert BUY_THRESHOLD >= HOLD_THRESHOLD, "Buy threshold must be at least as large as hold threshold"
 
+# Verdicts indexed by how many thresholds a final score clears
+VERDICTS = np.array(["AVOID", "HOLD", "BUY"])
+
 def calculate_final_score(performance_score, risk_score, sentiment_score, impact_score):
     return (performance_score * PERFORMANCE_WEIGHT) - (risk_score * RISK_WEIGHT) + (sentiment_score * SENTIMENT_WEIGHT) + (impact_score * IMPACT_WEIGHT)
 
+def classify_score(final_score):
+    if final_score > BUY_THRESHOLD:
+        return "BUY"
+    if final_score > HOLD_THRESHOLD:
+        return "HOLD"
+    return "AVOID"
+
+def calculate_final_scores(performance_scores, risk_scores, sentiment_scores, impact_scores, weights=None):
+    if weights is None:
+        weights = (PERFORMANCE_WEIGHT, RISK_WEIGHT, SENTIMENT_WEIGHT, IMPACT_WEIGHT)
+    performance_weight, risk_weight, sentiment_weight, impact_weight = weights
+    return (
+        np.asarray(performance_scores) * performance_weight
+        - np.asarray(risk_scores) * risk_weight
+        + np.asarray(sentiment_scores) * sentiment_weight
+        + np.asarray(impact_scores) * impact_weight
+    )
+
+def classify_scores(final_scores, buy_threshold=BUY_THRESHOLD, hold_threshold=HOLD_THRESHOLD):
+    final_scores = np.asarray(final_scores)
+    return VERDICTS[(final_scores > hold_threshold).astype(int) + (final_scores > buy_threshold)]
+
+def make_reccomendations(performance_scores, risk_scores, sentiment_scores, impact_scores, weights=None, buy_threshold=BUY_THRESHOLD, hold_threshold=HOLD_THRESHOLD):
+    final_scores = calculate_final_scores(performance_scores, risk_scores, sentiment_scores, impact_scores, weights)
+    return final_scores, classify_scores(final_scores, buy_threshold, hold_threshold)
+
+@register_tool
 @tool
 def make_reccomendation(performance_score:float, risk_score:float, sentiment_score:float, impact_score:float) -> str:
     """Determine a final recommendation based on the input from the team.
@@ -44,13 +75,7 @@ def make_reccomendation(performance_score:float, risk_score:float, sentiment_sco
         String: One of three recommendations: "BUY", "HOLD", "AVOID"
     """
     final_score = calculate_final_score(performance_score, risk_score, sentiment_score, impact_score)
-
-    if final_score > BUY_THRESHOLD:
-        return "BUY"
-    if final_score > HOLD_THRESHOLD:
-        return "HOLD"
-    return "AVOID"
+    return classify_score(final_score)
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
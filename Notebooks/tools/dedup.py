@@ -0,0 +1,113 @@
+import numpy as np
+import re
+import zlib
+
+""" Mission: Spot syndicated copies of the same story so each one is only classified (and counted) once.
+Techniques:
+    Each text is reduced to its set of hashed word shingles and summarized by a MinHash signature.
+    Locality-sensitive hashing: signatures are split into bands, and texts sharing any band become candidate pairs.
+    Candidates whose estimated Jaccard similarity clears SIMILARITY_THRESHOLD are merged (union-find).
+    DuplicateIndex keeps the buckets and signatures between calls, so texts streamed in chunks are grouped against
+    everything seen before. Items can have several views (e.g. headline and body); matching in any view merges them.
+Output: For every text, the index of the first text in its near-duplicate group, plus the group sizes
+"""
+
+# Hyperparameters
+SHINGLE_SIZE = 3
+PERMUTATIONS = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.8
+SEED = 520
+
+# Universal hashing modulo a Mersenne prime; shingle hashes are reduced below it first
+PRIME = (1 << 31) - 1
+EMPTY = np.iinfo(np.uint64).max
+_rng = np.random.default_rng(SEED)
+_multipliers = _rng.integers(1, PRIME, size=PERMUTATIONS, dtype=np.uint64)
+_offsets = _rng.integers(0, PRIME, size=PERMUTATIONS, dtype=np.uint64)
+
+def shingle_hashes(text):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[start:start + SHINGLE_SIZE]) for start in range(len(words) - SHINGLE_SIZE + 1)]
+    return np.unique(np.array([zlib.crc32(shingle.encode()) % PRIME for shingle in shingles], dtype=np.uint64))
+
+def signatures(texts):
+    # Rows of texts without any words stay at EMPTY and are never matched
+    result = np.full((len(texts), PERMUTATIONS), EMPTY, dtype=np.uint64)
+    for row, text in enumerate(texts):
+        hashes = shingle_hashes(text or "")
+        if len(hashes):
+            result[row] = ((_multipliers[:, None] * hashes[None, :] + _offsets[:, None]) % PRIME).min(axis=1)
+    return result
+
+def find(parents, index):
+    while parents[index] != index:
+        parents[index] = parents[parents[index]]
+        index = parents[index]
+    return index
+
+class DuplicateIndex:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.parents = []
+        # Per view: one bucket dictionary per band, and the signature row of every item
+        self.buckets = []
+        self.rows = []
+
+    def __len__(self):
+        return len(self.parents)
+
+    def union(self, first, index):
+        root, other = sorted((find(self.parents, first), find(self.parents, index)))
+        self.parents[other] = root
+
+    def add_signatures(self, *views):
+        start = len(self.parents)
+        self.parents.extend(range(start, start + len(views[0])))
+        while len(self.buckets) < len(views):
+            self.buckets.append([{} for _ in range(BANDS)])
+            self.rows.append([])
+
+        rows_per_band = PERMUTATIONS // BANDS
+        for view, signature_matrix in enumerate(views):
+            rows = self.rows[view]
+            rows.extend(np.asarray(signature_matrix, dtype=np.uint64).reshape(-1, PERMUTATIONS))
+            for index in range(start, len(rows)):
+                if rows[index][0] == EMPTY:
+                    continue
+                for band in range(BANDS):
+                    first = self.buckets[view][band].setdefault(rows[index][band * rows_per_band:(band + 1) * rows_per_band].tobytes(), index)
+                    # Only merge candidates whose whole signature agrees often enough
+                    if first != index and np.mean(rows[first] == rows[index]) >= self.threshold:
+                        self.union(first, index)
+        return start
+
+    def add(self, *views):
+        # Each view is a list of texts, one per item; returns the position of the first added item
+        return self.add_signatures(*(signatures(texts) for texts in views))
+
+    def signatures_from(self, start):
+        return [np.array(rows[start:], dtype=np.uint64).reshape(-1, PERMUTATIONS) for rows in self.rows]
+
+    def groups(self):
+        return np.array([find(self.parents, index) for index in range(len(self.parents))], dtype=int)
+
+def duplicate_groups(texts, threshold=SIMILARITY_THRESHOLD):
+    index = DuplicateIndex(threshold)
+    index.add(list(texts))
+    return index.groups()
+
+def group_counts(groups):
+    return np.bincount(groups, minlength=len(groups))[groups]
+
+def article_text(article):
+    # Articles arrive as lists of paragraphs (or None when they could not be fetched)
+    if not article:
+        return ""
+    return article if isinstance(article, str) else " ".join(article)
+
+def article_groups(articles, threshold=SIMILARITY_THRESHOLD):
+    return duplicate_groups([article_text(article) for article in articles], threshold)
@@ -1,5 +1,7 @@
 class YahooResponseError(Exception):
-    pass
+    def __init__(self, status_code=None):
+        super().__init__(status_code)
+        self.status_code = status_code
 
 class NewsResponseError(Exception):
     pass
@@ -7,5 +9,11 @@ class NewsResponseError(Exception):
 class TimeFrameError(Exception):
     pass
 
+class NoArticlesError(Exception):
+    pass
+
 class RecommendationError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ImpactIndexError(Exception):
+    pass
@@ -1,8 +1,9 @@
+import numpy as np
+
 from smolagents import tool
-from sys import modules
 from textwrap import dedent
 
-from .utils import get_tool_names
+from .utils import get_tools, register_tool
 from .errors import RecommendationError
 
 """ Author: Tadhbir Singh
@@ -20,24 +21,31 @@ Techniques:
 Output: Final Approved Verdict
 """
 
+# Hyperparameters
+MIN_BUY_PERFORMANCE = 0.15
+MAX_BUY_RISK = 0.7
+MIN_HOLD_SENTIMENT = -0.8
+MIN_AVOID_IMPACT = 0.95
+MIN_AVOID_SENTIMENT = 0.5
+
 def evaluate(performance_score, risk_score, sentiment_score, impact_score, recommendation):
     if recommendation == "BUY":
-        if performance_score < 0.15:
+        if performance_score < MIN_BUY_PERFORMANCE:
             # Performance is too low
             return "FAIL"
-        if risk_score > 0.7:
+        if risk_score > MAX_BUY_RISK:
             # Risk is too high
             return "FAIL"
         return "PASS"
     
     elif recommendation == "HOLD":
-        if sentiment_score < -0.8:
+        if sentiment_score < MIN_HOLD_SENTIMENT:
             # Too negative a sentiment
             return "FAIL"
         return "PASS"
     
     elif recommendation == "AVOID":
-        if impact_score >= 0.95 and sentiment_score >= 0.5:
+        if impact_score >= MIN_AVOID_IMPACT and sentiment_score >= MIN_AVOID_SENTIMENT:
             # Too important to pass up
             return "FAIL"
         return "PASS"
@@ -45,6 +53,21 @@ def evaluate(performance_score, risk_score, sentiment_score, impact_score, recom
     else:
         raise RecommendationError
 
+def evaluate_many(performance_scores, risk_scores, sentiment_scores, impact_scores, recommendations):
+    performance_scores, risk_scores, sentiment_scores, impact_scores = (
+        np.asarray(scores) for scores in (performance_scores, risk_scores, sentiment_scores, impact_scores)
+    )
+    recommendations = np.asarray(recommendations)
+    if not np.isin(recommendations, ["BUY", "HOLD", "AVOID"]).all():
+        raise RecommendationError
+
+    buy_fails = (recommendations == "BUY") & ((performance_scores < MIN_BUY_PERFORMANCE) | (risk_scores > MAX_BUY_RISK))
+    hold_fails = (recommendations == "HOLD") & (sentiment_scores < MIN_HOLD_SENTIMENT)
+    avoid_fails = (recommendations == "AVOID") & (impact_scores >= MIN_AVOID_IMPACT) & (sentiment_scores >= MIN_AVOID_SENTIMENT)
+    # True where the recommendation passes
+    return ~(buy_fails | hold_fails | avoid_fails)
+
+@register_tool
 @tool
 def check_logic(performance_score:float, risk_score:float, sentiment_score:float, impact_score:float, recommendation:str) -> str:
     """Review commander logic and determine if the logic is sound.
@@ -69,5 +92,4 @@ def check_logic(performance_score:float, risk_score:float, sentiment_score:float
         
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import warnings
+
+from datetime import datetime, timedelta
+from threading import Lock
+
+from .instrument import count
+from .limits import throttle
+from .utils import CACHE_DIR
+
+""" Mission: Train one DeepAR model across the whole symbol universe and reuse it for every forecast.
+Techniques:
+    A global DeepAR model is trained on every symbol's daily closes at once and serialized to MODEL_DIR.
+    At request time the stored predictor is loaded once per process and only runs inference.
+    A model older than MAX_MODEL_AGE_DAYS is stale: loading one warns, and retrain_if_stale replaces it. The nightly run is
+    `python -m tools.forecast SYMBOL ...` (Alpha Vantage key from ALPHA_API); screener.screen also retrains before a batch.
+    If no stored model exists, a single-symbol model is trained on the spot, as before, and kept in memory per symbol
+    for MAX_MODEL_AGE_DAYS so repeated calls only pay for inference.
+    alpha_vantage and gluonts (torch) are imported on first use, not when the module is imported.
+Output: Forecast price PREDICTION_LENGTH days past the end of the training window
+"""
+
+# Hyperparameters
+MODEL_DIR = CACHE_DIR / "deepar"
+PREDICTION_LENGTH = 10
+MAX_EPOCHS = 5
+MAX_MODEL_AGE_DAYS = 7
+
+_lock = Lock()
+_predictor = None
+_predictor_trained_at = None
+_fallback_predictors = {}
+
+def intraday_client(api_key):
+    from alpha_vantage.timeseries import TimeSeries
+    return TimeSeries(key=api_key, output_format="pandas", indexing_type="date")
+
+def closing_prices(api_key, instrument):
+    throttle("alpha_vantage")
+    time_series = intraday_client(api_key)
+    intra_data, _ = time_series.get_intraday(instrument, interval="60min", outputsize="full")
+    count("downloaded_bars", len(intra_data))
+    closing_data = intra_data[["4. close"]][::-16].rename(columns={"4. close": "price"})
+
+    # Fill in missing data from market closures (ie. weekends)
+    closing_data = closing_data.sort_index().asfreq(freq='1D')
+    closing_data["price"] = closing_data["price"].ffill()
+    return closing_data
+
+def training_window(closing_data):
+    # Hold back the last PREDICTION_LENGTH days so the forecast can be compared against the latest price
+    return closing_data.iloc[:-PREDICTION_LENGTH]
+
+def train_predictor(series, max_epochs=MAX_EPOCHS):
+    from gluonts.dataset.pandas import PandasDataset
+    from gluonts.torch import DeepAREstimator
+    dataset = PandasDataset({symbol: training_window(data) for symbol, data in series.items()}, target="price", freq="D")
+    return DeepAREstimator(
+        prediction_length=PREDICTION_LENGTH, freq="D", trainer_kwargs={"max_epochs": max_epochs}
+    ).train(dataset)
+
+def read_meta():
+    path = MODEL_DIR / "meta.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+def train_global_model(api_key, symbols, max_epochs=MAX_EPOCHS):
+    global _predictor, _predictor_trained_at
+    series = {symbol.upper(): closing_prices(api_key, symbol) for symbol in symbols}
+    predictor = train_predictor(series, max_epochs)
+
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    predictor.serialize(MODEL_DIR)
+    trained_at = datetime.now().isoformat()
+    (MODEL_DIR / "meta.json").write_text(json.dumps({"trained_at": trained_at, "symbols": sorted(series)}))
+
+    with _lock:
+        _predictor = predictor
+        _predictor_trained_at = trained_at
+    return predictor
+
+def is_older_than(trained_at, max_age_days=MAX_MODEL_AGE_DAYS):
+    return datetime.now() - datetime.fromisoformat(trained_at) > timedelta(days=max_age_days)
+
+def is_stale(max_age_days=MAX_MODEL_AGE_DAYS):
+    meta = read_meta()
+    if meta is None:
+        return True
+    return is_older_than(meta["trained_at"], max_age_days)
+
+def retrain_if_stale(api_key, symbols, max_age_days=MAX_MODEL_AGE_DAYS):
+    if is_stale(max_age_days):
+        return train_global_model(api_key, symbols)
+    return load_predictor()
+
+def load_predictor():
+    global _predictor, _predictor_trained_at
+    meta = read_meta()
+    if meta is None:
+        return None
+    with _lock:
+        # Pick up a model retrained by another process since we last loaded one
+        if _predictor is None or _predictor_trained_at != meta["trained_at"]:
+            from gluonts.model.predictor import Predictor
+            _predictor = Predictor.deserialize(MODEL_DIR)
+            _predictor_trained_at = meta["trained_at"]
+            if is_older_than(meta["trained_at"]):
+                warnings.warn(
+                    f"The global DeepAR model was trained at {meta['trained_at']}, more than {MAX_MODEL_AGE_DAYS} days ago; "
+                    "run `python -m tools.forecast SYMBOL ...` to retrain it",
+                    stacklevel=2,
+                )
+        return _predictor
+
+def fallback_predictor(instrument, closing_data):
+    # Without a global model, train one for this symbol and keep it until it is as old as a stale global model
+    symbol = instrument.upper()
+    with _lock:
+        cached = _fallback_predictors.get(symbol)
+    if cached is not None and not is_older_than(cached[0]):
+        return cached[1]
+    predictor = train_predictor({symbol: closing_data})
+    with _lock:
+        _fallback_predictors[symbol] = (datetime.now().isoformat(), predictor)
+    return predictor
+
+def forecast_price(instrument, closing_data):
+    from gluonts.dataset.pandas import PandasDataset
+    predictor = load_predictor()
+    if predictor is None:
+        predictor = fallback_predictor(instrument, closing_data)
+
+    dataset = PandasDataset({instrument.upper(): training_window(closing_data)}, target="price", freq="D")
+    forecasts = list(predictor.predict(dataset))
+    return forecasts[0].quantile(q="p1")[-1].item()
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the global DeepAR model on a symbol universe (nightly run).")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--api-key", default=os.environ.get("ALPHA_API"), help="Alpha Vantage key - default: $ALPHA_API")
+    parser.add_argument("--force", action="store_true", help="Retrain even if the stored model is not stale")
+    parser.add_argument("--max-epochs", type=int, default=MAX_EPOCHS)
+    arguments = parser.parse_args()
+    if not arguments.api_key:
+        parser.error("an Alpha Vantage key is required (--api-key or ALPHA_API)")
+
+    if arguments.force or is_stale():
+        train_global_model(arguments.api_key, arguments.symbols, arguments.max_epochs)
+        print(f"Trained the global model on {len(arguments.symbols)} symbols; saved to {MODEL_DIR}")
+    else:
+        print(f"The global model in {MODEL_DIR} is not stale yet; use --force to retrain")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import numpy as np
+
+from pathlib import Path
+from threading import Lock
+from time import time
+
+from .dedup import EMPTY, PERMUTATIONS
+from .utils import CACHE_DIR, open_store
+
+""" Mission: Remember every recommendation and every set of weights across runs.
+Techniques:
+    Append-only SQLite tables: one row per scored symbol, one row per saved set of weights.
+    Runs are indexed on (symbol, timestamp), so per-symbol range queries never scan the whole history.
+    The latest weights are the last row by primary key; they are cached and only re-read after a write.
+    On first use the weights table is seeded from optimizer-weights.csv.
+    Per-article sentiment scores are kept per query with their MinHash signatures; the newest publish time is that
+    query's watermark.
+Output: Run records, score history arrays and the current weights
+"""
+
+# Hyperparameters
+HISTORY_PATH = CACHE_DIR / "runs.sqlite"
+SEED_WEIGHTS_PATH = Path(__file__).resolve().parent.parent / "optimizer-weights.csv"
+SCORE_COLUMNS = ["performance", "risk", "sentiment", "impact"]
+WEIGHT_COLUMNS = ["performance_weight", "risk_weight", "sentiment_weight", "impact_weight", "buy_threshold", "hold_threshold"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    performance REAL NOT NULL,
+    risk REAL NOT NULL,
+    sentiment REAL NOT NULL,
+    impact REAL NOT NULL,
+    final_score REAL NOT NULL,
+    verdict TEXT NOT NULL,
+    evaluation TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_symbol_timestamp ON runs (symbol, timestamp);
+CREATE TABLE IF NOT EXISTS weights (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    performance_weight REAL NOT NULL,
+    risk_weight REAL NOT NULL,
+    sentiment_weight REAL NOT NULL,
+    impact_weight REAL NOT NULL,
+    buy_threshold REAL NOT NULL,
+    hold_threshold REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_scores (
+    query TEXT NOT NULL,
+    url TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    score REAL NOT NULL,
+    headline_signature BLOB,
+    body_signature BLOB,
+    PRIMARY KEY (query, url)
+);
+CREATE INDEX IF NOT EXISTS article_scores_query_published_at ON article_scores (query, published_at);
+"""
+
+_lock = Lock()
+_connection = None
+_latest_weights = None
+_data_version = None
+
+def get_connection():
+    global _connection
+    if _connection is None:
+        _connection = open_store(HISTORY_PATH, SCHEMA)
+        columns = [row[1] for row in _connection.execute("PRAGMA table_info(article_scores)")]
+        for column in ["headline_signature", "body_signature"]:
+            if column not in columns:
+                # Scores stored before duplicate grouping have no signatures and never match another article
+                _connection.execute(f"ALTER TABLE article_scores ADD COLUMN {column} BLOB")
+        if _connection.execute("SELECT COUNT(*) FROM weights").fetchone()[0] == 0 and SEED_WEIGHTS_PATH.exists():
+            import_weights_csv(_connection, SEED_WEIGHTS_PATH)
+    return _connection
+
+def import_weights_csv(connection, path):
+    rows = []
+    for line in Path(path).read_text().splitlines()[1:]:
+        if line.strip():
+            rows.append(tuple(float(value) for value in line.split(", ")))
+    with connection:
+        connection.executemany(
+            f"INSERT INTO weights (timestamp, {', '.join(WEIGHT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(time(), *row) for row in rows],
+        )
+
+def record_run(result, timestamp=None):
+    scores = result["scores"]
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                "INSERT INTO runs (symbol, timestamp, performance, risk, sentiment, impact, final_score, verdict, evaluation) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result["symbol"],
+                    timestamp or time(),
+                    *(float(scores[name]) for name in SCORE_COLUMNS),
+                    float(result["final_score"]),
+                    str(result["verdict"]),
+                    str(result["evaluation"]),
+                ),
+            )
+
+def runs_for(symbol, start=None, end=None):
+    with _lock:
+        connection = get_connection()
+        cursor = connection.execute(
+            "SELECT * FROM runs WHERE symbol = ? AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp",
+            (symbol, start if start is not None else float("-inf"), end if end is not None else float("inf")),
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def score_history(symbol=None, start=None):
+    query = f"SELECT {', '.join(SCORE_COLUMNS)} FROM runs WHERE timestamp >= ?"
+    parameters = [start if start is not None else float("-inf")]
+    if symbol is not None:
+        query += " AND symbol = ?"
+        parameters.append(symbol)
+    with _lock:
+        rows = get_connection().execute(query, parameters).fetchall()
+    return np.array(rows, dtype=np.float64).reshape(-1, len(SCORE_COLUMNS))
+
+def latest_weights():
+    global _latest_weights, _data_version
+    with _lock:
+        connection = get_connection()
+        # data_version only changes when another connection commits, so a cached row stays valid until then
+        data_version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if _latest_weights is None or data_version != _data_version:
+            row = connection.execute(f"SELECT {', '.join(WEIGHT_COLUMNS)} FROM weights ORDER BY id DESC LIMIT 1").fetchone()
+            _latest_weights = tuple(row) if row else None
+            _data_version = data_version
+        return _latest_weights
+
+def save_weights(values):
+    global _latest_weights
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                f"INSERT INTO weights (timestamp, {', '.join(WEIGHT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time(), *(float(value) for value in values)),
+            )
+        _latest_weights = tuple(float(value) for value in values)
+
+def sentiment_watermark(query):
+    with _lock:
+        row = get_connection().execute("SELECT MAX(published_at) FROM article_scores WHERE query = ?", (query,)).fetchone()
+    return row[0]
+
+def record_article_scores(query, rows):
+    # rows are (url, published_at, score, headline_signature, body_signature) tuples; signatures are MinHash arrays
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO article_scores (query, url, published_at, score, headline_signature, body_signature) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (query, url, float(published_at), float(score), headline.astype(np.uint64).tobytes(), body.astype(np.uint64).tobytes())
+                    for url, published_at, score, headline, body in rows
+                ],
+            )
+
+def read_signatures(blobs):
+    # Missing signatures (rows stored before they were recorded) read as EMPTY and are never matched
+    matrix = np.full((len(blobs), PERMUTATIONS), EMPTY, dtype=np.uint64)
+    for row, blob in enumerate(blobs):
+        if blob is not None:
+            matrix[row] = np.frombuffer(blob, dtype=np.uint64)
+    return matrix
+
+def article_scores(query, since):
+    # Returns the (published_at, score) rows of the window, then the headline and body signatures in the same order
+    with _lock:
+        rows = get_connection().execute(
+            "SELECT published_at, score, headline_signature, body_signature FROM article_scores "
+            "WHERE query = ? AND published_at >= ? ORDER BY published_at, url",
+            (query, since),
+        ).fetchall()
+    scores = np.array([row[:2] for row in rows], dtype=np.float64).reshape(-1, 2)
+    return scores, read_signatures([row[2] for row in rows]), read_signatures([row[3] for row in rows])
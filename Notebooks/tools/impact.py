@@ -1,8 +1,16 @@
-from numpy import random
+import argparse
+import csv
+import json
+import numpy as np
+
+from datetime import datetime
+from pathlib import Path
 from smolagents import tool
-from sys import modules
+from textwrap import dedent
+from threading import Lock
 
-from .utils import get_tool_names
+from .errors import ImpactIndexError
+from .utils import CACHE_DIR, get_tools, register_tool
 
 """ Author: Tadhbir Singh
 Mission: Evaluate sustainability, innovation, and ethical governance.
@@ -10,15 +18,141 @@ Models Used:
     TF-IDF + Logistic Regression - to extract and classify ESG mentions.
     KMeans Clustering - for grouping firms by ESG similarity.
 Tools & Libraries:
-    requests, scikit-learn, pandas
+    scikit-learn, scipy.sparse, numpy
 Techniques:
     Text mining, keyword extraction, and environmental/social/governance scoring from company reports and articles.
+    build_index is the offline step (run nightly with `python -m tools.impact build`): every document under CORPUS_DIR/<SYMBOL>/*.txt is vectorized with
+    TF-IDF and averaged into one sparse row per symbol, the classifier is fitted on the labeled seed sentences and the
+    symbols are clustered; all of it is saved to INDEX_DIR.
+    At request time nothing is refitted: a batch of symbols is scored with one sparse matrix-vector product against the
+    stored index, blended with the mean score of each symbol's cluster. Symbols not in the index score NaN, and the tool
+    reports them (and a missing index) as errors rather than inventing a neutral score.
 Output: Impact Score (0-1)
 """
 
+# Hyperparameters
+CORPUS_DIR = Path(__file__).resolve().parent.parent / "corpus"
+SEED_PATH = Path(__file__).resolve().parent.parent / "impact-seed.csv"
+INDEX_DIR = CACHE_DIR / "impact"
+MAX_FEATURES = 50_000
+CLUSTERS = 8
+PEER_WEIGHT = 0.25
+SEED = 520
+
+_lock = Lock()
+_index = None
+_index_key = None
+
+def read_corpus(corpus_dir):
+    symbols = []
+    documents = []
+    owners = []
+    for directory in sorted(path for path in Path(corpus_dir).iterdir() if path.is_dir()):
+        texts = [path.read_text(errors="ignore") for path in sorted(directory.glob("*.txt"))]
+        if texts:
+            owners.extend([len(symbols)] * len(texts))
+            documents.extend(texts)
+            symbols.append(directory.name.upper())
+    return symbols, documents, np.array(owners, dtype=int)
+
+def read_seed(path):
+    # label 1: ESG strength (renewables, governance, community), label 0: ESG controversy (spills, fines, fraud)
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    return [row["text"] for row in rows], np.array([int(row["label"]) for row in rows])
+
+def sigmoid(logits):
+    return 1 / (1 + np.exp(-logits))
+
+def build_index(corpus_dir=CORPUS_DIR, index_dir=None, seed_path=SEED_PATH):
+    from scipy import sparse
+    from sklearn.cluster import KMeans
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import normalize
+
+    symbols, documents, owners = read_corpus(corpus_dir)
+    if not symbols:
+        raise ValueError(f"No documents found under {corpus_dir}")
+    seed_texts, seed_labels = read_seed(seed_path)
+
+    vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, ngram_range=(1, 2), max_features=MAX_FEATURES)
+    vectorizer.fit(documents + seed_texts)
+
+    # One row per symbol: the (symbols x documents) membership matrix sums each symbol's documents, then rows are
+    # L2-normalized like the document rows the classifier is trained on
+    membership = sparse.csr_matrix(
+        (np.ones(len(owners)), (owners, np.arange(len(owners)))), shape=(len(symbols), len(owners))
+    )
+    symbol_matrix = normalize(membership @ vectorizer.transform(documents)).tocsr()
+
+    classifier = LogisticRegression(max_iter=1000, random_state=SEED).fit(vectorizer.transform(seed_texts), seed_labels)
+    coefficients = classifier.coef_[0]
+    intercept = float(classifier.intercept_[0])
+    own_scores = sigmoid(symbol_matrix @ coefficients + intercept)
+
+    kmeans = KMeans(n_clusters=min(CLUSTERS, len(symbols)), n_init=10, random_state=SEED).fit(symbol_matrix)
+    cluster_scores = np.bincount(kmeans.labels_, weights=own_scores) / np.bincount(kmeans.labels_)
+
+    index_dir = Path(index_dir or INDEX_DIR)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(index_dir / "symbols.npz", symbol_matrix)
+    np.save(index_dir / "coefficients.npy", coefficients)
+    np.save(index_dir / "centroids.npy", kmeans.cluster_centers_)
+    np.save(index_dir / "clusters.npy", kmeans.labels_)
+    np.save(index_dir / "peer_scores.npy", cluster_scores[kmeans.labels_])
+    # meta.json is written last; readers only switch to a new index once it changes
+    (index_dir / "meta.json").write_text(json.dumps({
+        "built_at": datetime.now().isoformat(),
+        "symbols": symbols,
+        "intercept": intercept,
+        "documents": len(documents),
+        "terms": len(vectorizer.vocabulary_),
+    }))
+    return symbols
+
+def read_meta(index_dir=None):
+    path = Path(index_dir or INDEX_DIR) / "meta.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+def load_index(index_dir=None):
+    global _index, _index_key
+    index_dir = Path(index_dir or INDEX_DIR)
+    meta = read_meta(index_dir)
+    if meta is None:
+        return None
+    with _lock:
+        # Pick up an index rebuilt by another process (or read from another directory) since we last loaded one
+        key = (index_dir, meta["built_at"])
+        if _index is None or _index_key != key:
+            from scipy import sparse
+            _index = {
+                "rows": {symbol: row for row, symbol in enumerate(meta["symbols"])},
+                "matrix": sparse.load_npz(index_dir / "symbols.npz").tocsr(),
+                "coefficients": np.load(index_dir / "coefficients.npy"),
+                "intercept": meta["intercept"],
+                "peer_scores": np.load(index_dir / "peer_scores.npy"),
+            }
+            _index_key = key
+        return _index
+
+def impact_scores(symbols, index_dir=None):
+    index = load_index(index_dir)
+    if index is None:
+        raise ImpactIndexError
+    scores = np.full(len(symbols), np.nan)
+
+    rows = np.array([index["rows"].get(symbol.upper(), -1) for symbol in symbols], dtype=int)
+    known = rows >= 0
+    if known.any():
+        own_scores = sigmoid(index["matrix"][rows[known]] @ index["coefficients"] + index["intercept"])
+        scores[known] = (1 - PEER_WEIGHT) * own_scores + PEER_WEIGHT * index["peer_scores"][rows[known]]
+    return scores
+
+@register_tool
 @tool
 def calculate_impact_score(symbol:str) -> float:
-    """Calculate an impact score based on simulation.
+    """Calculate an impact score from ESG mentions in the company's filings and news articles.
 
     Args:
         symbol (str): Financial instrument symbol in question.
@@ -26,9 +160,34 @@ def calculate_impact_score(symbol:str) -> float:
     Returns:
         Float: The impact score.
     """
-    return random.random()
+    try:
+        score = impact_scores([symbol])[0].item()
+    except ImpactIndexError:
+        return dedent(f"""
+                      There is no impact index to score against.  It is built offline from the documents under {CORPUS_DIR}/<SYMBOL>/*.txt;
+                      run `python -m tools.impact build` from the Notebooks directory, then call this tool again.
+                      """)
+    if np.isnan(score):
+        return dedent(f"""
+                      {symbol} is not in the impact index, so no impact score can be given.  Add its filings and articles as text files under
+                      {CORPUS_DIR}/{symbol.upper()}/ and rebuild the index with `python -m tools.impact build`.
+                      """)
+    return score
 
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the impact index from the ESG corpus (nightly run).")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--corpus-dir", type=Path, default=CORPUS_DIR, help="One directory of .txt documents per symbol")
+    parser.add_argument("--index-dir", type=Path, default=INDEX_DIR)
+    parser.add_argument("--seed-path", type=Path, default=SEED_PATH, help="Labeled seed sentences (text,label)")
+    arguments = parser.parse_args()
+
+    symbols = build_index(arguments.corpus_dir, arguments.index_dir, arguments.seed_path)
+    print(f"Indexed {len(symbols)} symbols from {arguments.corpus_dir}; saved to {arguments.index_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import numpy as np
+
+""" Mission: Compute technical indicators locally from stored daily closes.
+Techniques:
+    SMA from a rolling-window cumulative-sum kernel over a symbols x time matrix (oldest bar first).
+    EMA and MACD use one recursive pass over time, vectorized across symbols.
+    The SMA slope score uses the same 10/20/30-day weighted slope the Alpha Vantage version used.
+Output: Indicator matrices, one row per symbol
+"""
+
+# Hyperparameters
+SMA_WINDOW = 20
+SLOPE_OFFSETS = (10, 20, 30)
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+
+def sma(values, window=SMA_WINDOW):
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    totals = np.cumsum(values, axis=1)
+    totals = np.concatenate([np.zeros((values.shape[0], 1)), totals], axis=1)
+    return (totals[:, window:] - totals[:, :-window]) / window
+
+def ema(values, span):
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    alpha = 2 / (span + 1)
+    averages = np.empty_like(values)
+    averages[:, 0] = values[:, 0]
+    for step in range(1, values.shape[1]):
+        averages[:, step] = alpha * values[:, step] + (1 - alpha) * averages[:, step - 1]
+    return averages
+
+def macd(values, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    macd_line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+def sma_slope_scores(closes, window=SMA_WINDOW, offsets=SLOPE_OFFSETS):
+    # Slope of the SMA line from each offset back to today, weighted towards the shortest offset
+    averages = sma(closes, window)
+    latest = averages[:, -1]
+    weighted_sma = 0
+    for rank, offset in enumerate(offsets):
+        weighted_sma += (len(offsets) - rank) * (latest - averages[:, -1 - offset]) / offset
+    return weighted_sma / sum(range(1, len(offsets) + 1))
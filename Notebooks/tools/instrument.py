@@ -0,0 +1,242 @@
+import json
+import tracemalloc
+
+from collections import deque
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import getpid
+from threading import Lock, Thread, get_ident, local
+from time import perf_counter, thread_time
+
+""" Mission: Show where the time goes inside a run, per tool and per internal stage.
+Techniques:
+    Tools and key stages are wrapped with stage(name). While instrumentation is disabled the wrapper is a single
+    flag check, so it can stay on in production code.
+    Each call records wall time, CPU time (of the calling thread) and, with track_memory, the tracemalloc peak.
+    Counters such as network bytes and cache hits are added with count(); they are attributed to every stage open
+    on the current thread and kept as process totals. Work handed to a thread pool is wrapped with propagate_spans,
+    so counters from the pool threads still reach the stage that submitted it.
+    network_bytes only covers requests made through tools.fetch (NewsAPI and article pages). yfinance and Alpha Vantage
+    download through their own HTTP clients, which report no sizes, so their stages count downloaded_bars instead.
+    Metrics are readable in process (get_metrics), as Prometheus text (prometheus_text / serve) and as a
+    Chrome trace file (write_trace, viewable in chrome://tracing or Perfetto).
+Output: Per-stage call counts, timings, memory peaks and counters
+"""
+
+# Hyperparameters
+METRICS_PORT = 9464
+MAX_TRACE_EVENTS = 100_000
+
+_lock = Lock()
+_local = local()
+_enabled = False
+_track_memory = False
+_metrics = {}
+_totals = {}
+_events = deque(maxlen=MAX_TRACE_EVENTS)
+_server = None
+
+def enable(track_memory=False):
+    global _enabled, _track_memory
+    _track_memory = track_memory
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+def disable():
+    global _enabled, _track_memory
+    _enabled = False
+    if _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _track_memory = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _metrics.clear()
+        _totals.clear()
+        _events.clear()
+
+def open_spans():
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        spans = _local.spans = []
+    return spans
+
+def count(counter, value=1):
+    if not _enabled:
+        return
+    # Spans can be shared with pool threads (propagate_spans), so they are updated under the lock as well
+    with _lock:
+        for span in open_spans():
+            span["counters"][counter] = span["counters"].get(counter, 0) + value
+        _totals[counter] = _totals.get(counter, 0) + value
+
+def propagate_spans(function):
+    # Capture the caller's open stages; each pool task runs with them installed on its own thread
+    spans = list(open_spans()) if _enabled else []
+    if not spans:
+        return function
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "spans", None)
+        _local.spans = list(spans)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _local.spans = previous
+    return wrapper
+
+def record(name, wall_seconds, cpu_seconds, peak_bytes, counters, failed, started):
+    with _lock:
+        metric = _metrics.setdefault(name, {
+            "calls": 0,
+            "errors": 0,
+            "wall_seconds": 0.0,
+            "cpu_seconds": 0.0,
+            "max_wall_seconds": 0.0,
+            "peak_bytes": 0,
+            "counters": {},
+        })
+        metric["calls"] += 1
+        metric["errors"] += failed
+        metric["wall_seconds"] += wall_seconds
+        metric["cpu_seconds"] += cpu_seconds
+        metric["max_wall_seconds"] = max(metric["max_wall_seconds"], wall_seconds)
+        metric["peak_bytes"] = max(metric["peak_bytes"], peak_bytes)
+        for counter, value in counters.items():
+            metric["counters"][counter] = metric["counters"].get(counter, 0) + value
+        _events.append({
+            "name": name,
+            "ph": "X",
+            "ts": started * 1e6,
+            "dur": wall_seconds * 1e6,
+            "pid": getpid(),
+            "tid": get_ident(),
+            "args": {"cpu_seconds": cpu_seconds, "peak_bytes": peak_bytes, "error": bool(failed), **counters},
+        })
+
+def run_instrumented(name, function, args, kwargs):
+    spans = open_spans()
+    span = {"counters": {}, "peak": 0}
+    memory = _track_memory and tracemalloc.is_tracing()
+    if memory:
+        start_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    spans.append(span)
+    failed = False
+    started = perf_counter()
+    cpu_started = thread_time()
+    try:
+        return function(*args, **kwargs)
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        wall_seconds = perf_counter() - started
+        cpu_seconds = thread_time() - cpu_started
+        spans.pop()
+        peak_bytes = 0
+        if memory:
+            # A nested stage resets the peak, so take the larger of ours and our children's; the tracemalloc peak
+            # is process wide, so concurrent threads are included in it
+            peak = max(tracemalloc.get_traced_memory()[1], span["peak"])
+            peak_bytes = max(peak - start_memory, 0)
+            if spans:
+                spans[-1]["peak"] = max(spans[-1]["peak"], peak)
+        record(name, wall_seconds, cpu_seconds, peak_bytes, span["counters"], failed, started)
+
+def stage(name):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            return run_instrumented(name, function, args, kwargs)
+        return wrapper
+    return decorator
+
+def instrument_tools(tools):
+    # smolagents tools call self.forward, so wrapping forward on the instance covers agent and direct calls alike
+    for tool in tools:
+        if not getattr(tool.forward, "instrumented", False):
+            tool.forward = stage(f"tool.{tool.name}")(tool.forward)
+            tool.forward.instrumented = True
+    return tools
+
+def get_metrics():
+    with _lock:
+        return {
+            "stages": {name: {**metric, "counters": dict(metric["counters"])} for name, metric in _metrics.items()},
+            "totals": dict(_totals),
+        }
+
+def prometheus_text():
+    metrics = get_metrics()
+    lines = []
+    for metric, key, kind in [
+        ("tools_stage_calls_total", "calls", "counter"),
+        ("tools_stage_errors_total", "errors", "counter"),
+        ("tools_stage_wall_seconds_total", "wall_seconds", "counter"),
+        ("tools_stage_cpu_seconds_total", "cpu_seconds", "counter"),
+        ("tools_stage_max_wall_seconds", "max_wall_seconds", "gauge"),
+        ("tools_stage_peak_bytes", "peak_bytes", "gauge"),
+    ]:
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{stage="{name}"}} {values[key]}' for name, values in metrics["stages"].items())
+    lines.append("# TYPE tools_stage_counter_total counter")
+    for name, values in metrics["stages"].items():
+        lines.extend(
+            f'tools_stage_counter_total{{stage="{name}",counter="{counter}"}} {value}'
+            for counter, value in values["counters"].items()
+        )
+    lines.append("# TYPE tools_counter_total counter")
+    lines.extend(f'tools_counter_total{{counter="{counter}"}} {value}' for counter, value in metrics["totals"].items())
+    return "\n".join(lines) + "\n"
+
+def trace_events():
+    with _lock:
+        return list(_events)
+
+def write_trace(path):
+    with open(path, "w") as file:
+        json.dump({"traceEvents": trace_events(), "displayTimeUnit": "ms"}, file)
+    return path
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = prometheus_text(), "text/plain; version=0.0.4"
+        elif self.path == "/trace":
+            body, content_type = json.dumps({"traceEvents": trace_events()}), "application/json"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=METRICS_PORT, host="127.0.0.1"):
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
+
+def stop_serving():
+    global _server
+    with _lock:
+        server, _server = _server, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,65 @@
+from threading import Lock
+from time import monotonic, sleep
+from urllib.parse import urlparse
+
+""" Mission: Keep every worker in the process inside each external API's rate limit.
+Techniques:
+    One token bucket per API, shared by all threads; a call waits until a token is available.
+    Budgets are (requests, seconds) pairs and can be changed at runtime with configure.
+Output: None - callers block until they are allowed to make their request
+"""
+
+# Hyperparameters: (requests, per seconds)
+RATE_LIMITS = {
+    "alpha_vantage": (5, 60),
+    "news_api": (100, 24 * 60 * 60),
+    "yahoo": (60, 60),
+}
+
+# Hosts whose requests count against an API budget when they go through tools.fetch
+HOST_APIS = {
+    "finance.yahoo.com": "yahoo",
+    "newsapi.org": "news_api",
+}
+
+class RateLimiter:
+    def __init__(self, requests, seconds):
+        self.capacity = requests
+        self.rate = requests / seconds
+        self.tokens = float(requests)
+        self.updated = monotonic()
+        self.lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+_lock = Lock()
+_limiters = {}
+
+def get_limiter(api):
+    with _lock:
+        if api not in _limiters:
+            _limiters[api] = RateLimiter(*RATE_LIMITS[api])
+        return _limiters[api]
+
+def configure(api, requests, seconds):
+    with _lock:
+        RATE_LIMITS[api] = (requests, seconds)
+        _limiters[api] = RateLimiter(requests, seconds)
+
+def throttle(api):
+    get_limiter(api).acquire()
+
+def throttle_url(url):
+    api = HOST_APIS.get(urlparse(url).netloc.removeprefix("www."))
+    if api is not None:
+        throttle(api)
@@ -0,0 +1,173 @@
+import json
+
+from hashlib import sha256
+from smolagents.models import ChatMessage, Model
+from threading import Lock
+from time import time
+
+from .instrument import count
+from .utils import CACHE_DIR, open_store
+
+""" Mission: Stop paying remote LLM latency for agent steps we have already seen.
+Techniques:
+    CachingModel wraps any smolagents model. Each request is keyed on a hash of (model id, messages, stop sequences,
+    response format, tool schemas), and the response message is stored in SQLite.
+    record mode serves hits from the store and sends misses to the wrapped model, storing the answer.
+    replay mode never stores; misses go to the wrapped model, which should be a local stand-in such as OfflineModel,
+    so the whole Commander team can run without network access:
+        CachingModel(OfflineModel(), mode="replay", model_id="Qwen/Qwen3-Coder-30B-A3B-Instruct")
+    The store is bounded to MAX_BYTES of responses; the least recently used ones are evicted first.
+Output: smolagents ChatMessage objects, as returned by the wrapped model
+"""
+
+# Hyperparameters
+CACHE_PATH = CACHE_DIR / "llm.sqlite"
+MAX_BYTES = 64 * 2**20
+MODES = ("record", "replay")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model_id TEXT,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+_lock = Lock()
+_connection = None
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+}
+
+def get_connection():
+    global _connection
+    if _connection is None:
+        _connection = open_store(CACHE_PATH, SCHEMA)
+    return _connection
+
+def message_to_dict(message):
+    if isinstance(message, dict):
+        return message
+    role = getattr(message.role, "value", message.role)
+    tool_calls = [
+        {"id": call.id, "type": call.type, "function": {"name": call.function.name, "arguments": call.function.arguments}}
+        for call in message.tool_calls or []
+    ]
+    return {"role": role, "content": message.content, "tool_calls": tool_calls or None}
+
+def tool_schema(tool):
+    return {"name": tool.name, "description": tool.description, "inputs": tool.inputs, "output_type": tool.output_type}
+
+def request_key(model_id, messages, stop_sequences=None, response_format=None, tools_to_call_from=None):
+    request = {
+        "model_id": model_id,
+        "messages": [message_to_dict(message) for message in messages],
+        "stop_sequences": stop_sequences,
+        "response_format": response_format,
+        "tools": [tool_schema(tool) for tool in tools_to_call_from or []],
+    }
+    return sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+def get_response(key):
+    with _lock:
+        connection = get_connection()
+        row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        with connection:
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time(), key))
+        return json.loads(row[0])
+
+def evict(connection, max_bytes=None):
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total <= max_bytes:
+        return
+    # Walk from the least recently used response until enough space is freed
+    excess = total - max_bytes
+    keys = []
+    for key, size in connection.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+        keys.append((key,))
+        excess -= size
+        if excess <= 0:
+            break
+    with connection:
+        connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+    _stats["evictions"] += len(keys)
+
+def put_response(key, model_id, response):
+    text = json.dumps(response, default=str)
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model_id, response, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model_id, text, len(text), time()),
+            )
+        evict(connection)
+
+def clear():
+    with _lock:
+        connection = get_connection()
+        with connection:
+            connection.execute("DELETE FROM responses")
+
+def get_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"], stats["bytes"] = get_connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+    return stats
+
+class OfflineModel(Model):
+    def __init__(self, answer="HOLD", model_id="offline-stand-in", **kwargs):
+        super().__init__(model_id=model_id, **kwargs)
+        self.answer = answer
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        # Every agent finishes on its first step, so replayed runs exercise the orchestration without any real reasoning
+        return ChatMessage.from_dict({
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{
+                "id": "call_0",
+                "type": "function",
+                "function": {"name": "final_answer", "arguments": {"answer": self.answer}},
+            }],
+        })
+
+class CachingModel(Model):
+    def __init__(self, model, mode="record", model_id=None, **kwargs):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: {mode}")
+        # Replaying a recording made with another model needs that model's id, since it is part of every key
+        super().__init__(model_id=model_id or getattr(model, "model_id", None), **kwargs)
+        self.model = model
+        self.mode = mode
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        key = request_key(self.model_id, messages, stop_sequences, response_format, tools_to_call_from)
+        cached = get_response(key)
+        if cached is not None:
+            count("llm_cache_hits")
+            return ChatMessage.from_dict(cached)
+
+        count("llm_cache_misses")
+        message = self.model.generate(
+            messages,
+            stop_sequences=stop_sequences,
+            response_format=response_format,
+            tools_to_call_from=tools_to_call_from,
+            **kwargs,
+        )
+        if self.mode == "record":
+            put_response(key, self.model_id, message_to_dict(message))
+        return message
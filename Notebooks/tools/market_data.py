@@ -0,0 +1,147 @@
+import json
+import numpy as np
+import pandas as pd
+
+from datetime import date
+from threading import Lock
+
+from .instrument import count
+from .limits import throttle
+from .utils import CACHE_DIR
+
+""" Mission: Download each symbol's daily history once and serve every period from local storage.
+Techniques:
+    Each column of a symbol's history is kept as its own .npy file and opened memory-mapped.
+    Period slices ("1y", "3y", ...) are views into those maps, so no data is copied.
+    A symbol is refreshed at most once per day. Only the last OVERLAP_BARS stored bars and anything newer are downloaded:
+    the overlap replaces the stored bars, so a partial bar stored during market hours is rewritten once the day closes.
+    Yahoo bars are split- and dividend-adjusted, so an overlap that no longer matches the stored history (beyond the last
+    bar) means the whole history was re-adjusted, and it is reloaded in full rather than appended to.
+Output: Dictionaries of numpy column views (Date, Open, High, Low, Close, Volume)
+"""
+
+# Hyperparameters
+STORE_DIR = CACHE_DIR / "market"
+INITIAL_PERIOD = "5y"
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+OVERLAP_BARS = 5
+ADJUSTMENT_TOLERANCE = 1e-6
+
+_lock = Lock()
+_symbol_locks = {}
+_loaded = {}
+_refreshed = {}
+
+def symbol_dir(symbol):
+    return STORE_DIR / symbol.upper()
+
+def read_meta(symbol):
+    path = symbol_dir(symbol) / "meta.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def load_columns(symbol):
+    directory = symbol_dir(symbol)
+    if not (directory / "Date.npy").exists():
+        return None
+    return {column: np.load(directory / f"{column}.npy", mmap_mode="r") for column in ["Date", *COLUMNS]}
+
+def frame_to_columns(frame):
+    index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    columns = {"Date": index.normalize().to_numpy(dtype="datetime64[ns]")}
+    for column in COLUMNS:
+        columns[column] = frame[column].to_numpy(dtype=np.float64)
+    return columns
+
+def write_meta(symbol, refreshed):
+    directory = symbol_dir(symbol)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "meta.json").write_text(json.dumps({"refreshed": refreshed}))
+
+def write_columns(symbol, columns):
+    directory = symbol_dir(symbol)
+    directory.mkdir(parents=True, exist_ok=True)
+    for column, values in columns.items():
+        # Write beside the live file and swap it in so open memory maps are never truncated underneath a reader
+        temporary = directory / f"{column}.tmp.npy"
+        np.save(temporary, values)
+        temporary.replace(directory / f"{column}.npy")
+
+def open_ticker(symbol):
+    from yfinance import Ticker
+    return Ticker(symbol)
+
+def download_full_columns(symbol, ticker, start=None):
+    frame = ticker.history(period=INITIAL_PERIOD) if start is None else ticker.history(start=start)
+    count("downloaded_bars", len(frame))
+    if frame.empty:
+        raise ValueError(f"Yahoo returned no price history for {symbol}")
+    return frame_to_columns(frame)
+
+def overlap_matches(stored, new_columns):
+    # The last stored bar may have been partial, so only the bars before it have to agree
+    dates, stored_rows, new_rows = np.intersect1d(stored["Date"][:-1], new_columns["Date"], return_indices=True)
+    if not len(dates):
+        return False
+    return all(
+        np.allclose(stored[column][stored_rows], new_columns[column][new_rows], rtol=ADJUSTMENT_TOLERANCE, equal_nan=True)
+        for column in ["Open", "High", "Low", "Close"]
+    )
+
+def download_new_columns(symbol, stored):
+    throttle("yahoo")
+    ticker = open_ticker(symbol)
+    if stored is None:
+        return download_full_columns(symbol, ticker)
+
+    overlap_start = pd.Timestamp(stored["Date"][max(len(stored["Date"]) - OVERLAP_BARS, 0)])
+    new_frame = ticker.history(start=overlap_start.date().isoformat())
+    count("downloaded_bars", len(new_frame))
+    if new_frame.empty:
+        return None
+
+    new_columns = frame_to_columns(new_frame)
+    if len(stored["Date"]) > 1 and not overlap_matches(stored, new_columns):
+        # A split or dividend re-adjusted every earlier bar; appending would leave a false jump in the prices
+        return download_full_columns(symbol, ticker, start=pd.Timestamp(stored["Date"][0]).date().isoformat())
+
+    keep = stored["Date"] < new_columns["Date"][0]
+    return {column: np.concatenate([stored[column][keep], new_columns[column]]) for column in stored}
+
+def refresh(symbol):
+    symbol = symbol.upper()
+    today = date.today().isoformat()
+    with _lock:
+        symbol_lock = _symbol_locks.setdefault(symbol, Lock())
+
+    with symbol_lock:
+        if _refreshed.get(symbol) == today:
+            return _loaded[symbol]
+
+        stored = load_columns(symbol)
+        if stored is None or read_meta(symbol).get("refreshed") != today:
+            columns = download_new_columns(symbol, stored)
+            if columns is not None:
+                write_columns(symbol, columns)
+                stored = load_columns(symbol)
+            write_meta(symbol, today)
+
+        _loaded[symbol] = stored
+        _refreshed[symbol] = today
+        return stored
+
+def period_start(period):
+    today = pd.Timestamp(date.today())
+    if period.endswith("mo"):
+        return today - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return today - pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("d"):
+        return today - pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period: {period}")
+
+def get_history(symbol, period=INITIAL_PERIOD):
+    columns = refresh(symbol)
+    if period == "max":
+        return columns
+    start = np.searchsorted(columns["Date"], period_start(period).to_datetime64())
+    return {column: values[start:] for column, values in columns.items()}
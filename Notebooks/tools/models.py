@@ -0,0 +1,182 @@
+import numpy as np
+
+from threading import Lock, Thread
+from time import monotonic, perf_counter, sleep
+
+""" Mission: Share loaded transformer pipelines across every tool in the process.
+Techniques:
+    transformers itself is only imported when the first model is loaded.
+    Models are loaded lazily on first use and kept for the life of the process, so a watchlist run pays the load once.
+    Each model has its own lock, so concurrent callers wait for a single load instead of starting their own.
+    Idle models can be unloaded by setting MAX_IDLE_SECONDS. A daemon thread started with the first load sweeps for them
+    every SWEEP_SECONDS (get_stats also sweeps), so a model that is simply no longer called is released too.
+    Load time and inference time are tracked separately and exposed through get_stats.
+    Loaders can be registered per model name, e.g. to swap in a small local stand-in for benchmarks.
+    Paragraphs from every article are classified together in length-sorted batches, then majority-voted back per article.
+Output: Callable text-classification pipelines and per-article sentiment labels (-1, 0, 1)
+"""
+
+# Hyperparameters
+FINBERT_MODEL = "ProsusAI/finbert"
+MAX_LENGTH = 512
+MAX_IDLE_SECONDS = None
+BATCH_SIZE = 32
+SWEEP_SECONDS = 60
+
+# FinBERT labels in vote order, along with the sentiment value each one maps to
+LABELS = ["positive", "neutral", "negative"]
+LABEL_VALUES = np.array([1, 0, -1])
+
+_registry_lock = Lock()
+_model_locks = {}
+_pipelines = {}
+_loaders = {}
+_last_used = {}
+_sweeper = None
+_stats = {
+    "loads": 0,
+    "load_seconds": 0.0,
+    "inference_calls": 0,
+    "inference_seconds": 0.0,
+    "evictions": 0,
+}
+
+class TimedPipeline:
+    def __init__(self, model_name, pipe):
+        self.model_name = model_name
+        self.pipe = pipe
+
+    def __call__(self, inputs, **kwargs):
+        start = perf_counter()
+        try:
+            return self.pipe(inputs, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            with _registry_lock:
+                _stats["inference_calls"] += 1
+                _stats["inference_seconds"] += elapsed
+                _last_used[self.model_name] = monotonic()
+
+def register_loader(model_name, loader):
+    # loader takes no arguments and returns a callable with the text-classification pipeline interface
+    with _registry_lock:
+        _loaders[model_name] = loader
+    unload(model_name)
+
+def load_pipeline(model_name):
+    loader = _loaders.get(model_name)
+    if loader is not None:
+        return loader()
+    from transformers import pipeline
+    return pipeline("text-classification", model=model_name, max_length=MAX_LENGTH, truncation=True)
+
+def get_pipeline(model_name=FINBERT_MODEL):
+    if MAX_IDLE_SECONDS is not None:
+        evict_idle(MAX_IDLE_SECONDS, keep=model_name)
+
+    with _registry_lock:
+        pipe = _pipelines.get(model_name)
+        if pipe is not None:
+            _last_used[model_name] = monotonic()
+            return pipe
+        model_lock = _model_locks.setdefault(model_name, Lock())
+
+    with model_lock:
+        # Another thread may have finished loading while we waited on the lock
+        with _registry_lock:
+            if model_name in _pipelines:
+                return _pipelines[model_name]
+
+        start = perf_counter()
+        pipe = TimedPipeline(model_name, load_pipeline(model_name))
+        elapsed = perf_counter() - start
+
+        with _registry_lock:
+            _pipelines[model_name] = pipe
+            _last_used[model_name] = monotonic()
+            _stats["loads"] += 1
+            _stats["load_seconds"] += elapsed
+        start_sweeper()
+        return pipe
+
+def warm_up(model_names=(FINBERT_MODEL,)):
+    for model_name in model_names:
+        get_pipeline(model_name)
+
+def unload(model_name=None):
+    unloaded = 0
+    with _registry_lock:
+        model_names = list(_pipelines) if model_name is None else [model_name]
+        for name in model_names:
+            if _pipelines.pop(name, None) is not None:
+                _last_used.pop(name, None)
+                unloaded += 1
+    return unloaded
+
+def evict_idle(max_idle_seconds, keep=None):
+    now = monotonic()
+    with _registry_lock:
+        idle = [name for name, last_used in _last_used.items() if name != keep and now - last_used > max_idle_seconds]
+    # Only idle evictions are counted; manual unloads and loader swaps (register_loader) are not
+    evicted = sum(unload(name) for name in idle)
+    with _registry_lock:
+        _stats["evictions"] += evicted
+
+def sweep_idle():
+    if MAX_IDLE_SECONDS is not None:
+        evict_idle(MAX_IDLE_SECONDS)
+
+def run_sweeper():
+    while True:
+        # MAX_IDLE_SECONDS is read on every pass so it can be changed after models are loaded
+        sleep(min(SWEEP_SECONDS, MAX_IDLE_SECONDS or SWEEP_SECONDS))
+        sweep_idle()
+
+def start_sweeper():
+    global _sweeper
+    with _registry_lock:
+        if _sweeper is None:
+            _sweeper = Thread(target=run_sweeper, name="models-idle-sweeper", daemon=True)
+            _sweeper.start()
+
+def get_stats():
+    sweep_idle()
+    with _registry_lock:
+        stats = dict(_stats)
+        stats["loaded"] = list(_pipelines)
+    return stats
+
+def classify_articles(articles, batch_size=BATCH_SIZE, model_name=FINBERT_MODEL):
+    paragraphs = []
+    owners = []
+    for article_index, article in enumerate(articles):
+        # Articles are lists of paragraphs, but the chaining tools also pass whole articles as plain strings
+        for paragraph in [article] if isinstance(article, str) else article or []:
+            paragraphs.append(paragraph)
+            owners.append(article_index)
+
+    sentiment = np.zeros(len(articles), dtype=int)
+    if not paragraphs:
+        return sentiment
+
+    # Sorting by length keeps similarly sized paragraphs in the same batch so each forward pass pads as little as possible
+    pipe = get_pipeline(model_name)
+    order = np.argsort([len(paragraph) for paragraph in paragraphs], kind="stable")
+    label_ids = np.empty(len(paragraphs), dtype=int)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        results = pipe([paragraphs[index] for index in batch], batch_size=len(batch))
+        label_ids[batch] = [LABELS.index(result["label"]) if result["label"] in LABELS else len(LABELS) - 1 for result in results]
+
+    # Majority vote per article, ties going to the label that appeared first in the article
+    owners = np.array(owners)
+    positions = np.arange(len(paragraphs))
+    counts = np.zeros((len(articles), len(LABELS)), dtype=int)
+    first_seen = np.full((len(articles), len(LABELS)), len(paragraphs))
+    np.add.at(counts, (owners, label_ids), 1)
+    np.minimum.at(first_seen, (owners, label_ids), positions)
+    votes = np.argmax(counts * (len(paragraphs) + 1) - first_seen, axis=1)
+
+    has_paragraphs = counts.sum(axis=1) > 0
+    sentiment[has_paragraphs] = LABEL_VALUES[votes[has_paragraphs]]
+    return sentiment
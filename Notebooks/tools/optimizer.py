@@ -0,0 +1,125 @@
+import numpy as np
+
+from . import history
+from .commander import calculate_final_scores, classify_scores
+from .evaluator import evaluate_many
+
+""" Mission: Tune Commander's weights and thresholds against every score vector we have seen.
+Techniques:
+    Each candidate set of weights and thresholds is scored on the whole history at once with the vectorized
+    commander/evaluator functions. Thousands of candidates are evaluated per numpy call.
+    Coordinate search (step halving), random search and grid search (GRID_POINTS values per parameter by default);
+    coordinate and random search stop early once nothing improves.
+    Weights and the score history come from the run history store (tools.history), and saved weights are the ones
+    pipeline.recommend uses for every later recommendation.
+Output: The best weights and thresholds found, along with their evaluator pass rate
+"""
+
+# Hyperparameters
+PARAMETERS = history.WEIGHT_COLUMNS
+WEIGHT_BOUNDS = (0.0, 2.0)
+THRESHOLD_BOUNDS = (-1.0, 2.0)
+MAX_EVALUATION_CELLS = 5_000_000
+GRID_POINTS = 5
+
+def load_weights():
+    weights = history.latest_weights()
+    if weights is None:
+        raise ValueError("No weights have been saved yet")
+    return weights
+
+def save_weights(values):
+    history.save_weights(values)
+
+def constrain(candidates):
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.float64)).copy()
+    candidates[:, :4] = np.clip(candidates[:, :4], *WEIGHT_BOUNDS)
+    candidates[:, 4:] = np.clip(candidates[:, 4:], *THRESHOLD_BOUNDS)
+    # Commander requires the buy threshold to be at least the hold threshold
+    candidates[:, 4], candidates[:, 5] = candidates[:, 4:].max(axis=1), candidates[:, 4:].min(axis=1)
+    return candidates
+
+def pass_rates(scores, candidates):
+    scores = np.asarray(scores, dtype=np.float64)
+    candidates = np.atleast_2d(candidates)
+    performance, risk, sentiment, impact = (scores[:, [column]] for column in range(4))
+
+    rates = np.empty(len(candidates))
+    per_chunk = max(1, MAX_EVALUATION_CELLS // len(scores))
+    for start in range(0, len(candidates), per_chunk):
+        block = candidates[start:start + per_chunk]
+        final_scores = calculate_final_scores(performance, risk, sentiment, impact, weights=block[:, :4].T)
+        verdicts = classify_scores(final_scores, block[:, 4], block[:, 5])
+        rates[start:start + len(block)] = evaluate_many(performance, risk, sentiment, impact, verdicts).mean(axis=0)
+    return rates
+
+def coordinate_search(scores, start, step=0.1, min_step=0.005):
+    best = constrain(start)[0]
+    best_rate = pass_rates(scores, best)[0]
+    parameters = np.arange(len(best))
+    while step >= min_step and best_rate < 1:
+        # Every single-parameter move up or down by step, evaluated together
+        moves = np.repeat(best[None], 2 * len(best), axis=0)
+        moves[parameters, parameters] += step
+        moves[parameters + len(best), parameters] -= step
+        moves = constrain(moves)
+        rates = pass_rates(scores, moves)
+        if rates.max() > best_rate:
+            best, best_rate = moves[rates.argmax()], rates.max()
+        else:
+            step /= 2
+    return best, best_rate
+
+def random_search(scores, start, samples=20_000, batch_size=2_000, patience=3, seed=520):
+    rng = np.random.default_rng(seed)
+    best = constrain(start)[0]
+    best_rate = pass_rates(scores, best)[0]
+    stale_batches = 0
+    for _ in range(0, samples, batch_size):
+        if best_rate == 1 or stale_batches >= patience:
+            break
+        candidates = np.column_stack([
+            rng.uniform(*WEIGHT_BOUNDS, size=(batch_size, 4)),
+            rng.uniform(*THRESHOLD_BOUNDS, size=(batch_size, 2)),
+        ])
+        candidates = constrain(candidates)
+        rates = pass_rates(scores, candidates)
+        if rates.max() > best_rate:
+            best, best_rate = candidates[rates.argmax()], rates.max()
+            stale_batches = 0
+        else:
+            stale_batches += 1
+    return best, best_rate
+
+def default_grid(points=GRID_POINTS):
+    return [np.linspace(*WEIGHT_BOUNDS, points)] * 4 + [np.linspace(*THRESHOLD_BOUNDS, points)] * 2
+
+def grid_search(scores, start, grid=None):
+    # grid holds one array of values per parameter, in PARAMETERS order
+    grid = default_grid() if grid is None else grid
+    best = constrain(start)[0]
+    best_rate = pass_rates(scores, best)[0]
+    candidates = constrain(np.stack(np.meshgrid(*grid, indexing="ij"), axis=-1).reshape(-1, len(PARAMETERS)))
+    rates = pass_rates(scores, candidates)
+    # Like the other searches, never return something worse than the weights we started from
+    if rates.max() > best_rate:
+        best, best_rate = candidates[rates.argmax()], rates.max()
+    return best, best_rate
+
+def optimize(scores=None, method="coordinate", save=False, grid=None):
+    scores = history.score_history() if scores is None else np.asarray(scores, dtype=np.float64)
+    if len(scores) == 0:
+        raise ValueError("There is no score history to optimize against")
+    start = load_weights()
+    if method == "coordinate":
+        best, best_rate = coordinate_search(scores, start)
+    elif method == "random":
+        best, best_rate = random_search(scores, start)
+    elif method == "grid":
+        best, best_rate = grid_search(scores, start, grid)
+    else:
+        raise ValueError(f"Unknown search method: {method}")
+
+    if save:
+        save_weights(best.tolist())
+    return {**dict(zip(PARAMETERS, best.tolist())), "pass_rate": float(best_rate)}
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from math import isfinite
+from time import monotonic
+
+from . import commander, evaluator, impact, performance, risk, sentiment
+
+""" Mission: Run the four scoring agents' tools side by side instead of one after another.
+Techniques:
+    The Performance, Risk, Sentiment and Impact tools are submitted to a thread pool together, so a symbol takes as long as its slowest tool.
+    Each tool has its own timeout, measured from dispatch.
+    The gathered scores go straight to Commander's make_reccomendation and Evaluator's check_logic.
+Output: Dictionary of scores, errors, recommendation and evaluation for one symbol
+"""
+
+# Hyperparameters (seconds)
+TOOL_TIMEOUTS = {
+    "performance": 600,
+    "risk": 60,
+    "sentiment": 300,
+    "impact": 60,
+}
+
+def scoring_calls(symbol, news_api_key, alpha_api_key, query=None, incremental=False):
+    return {
+        "performance": lambda: performance.calculate_performance_score(alpha_api_key, symbol),
+        "risk": lambda: risk.calculate_risk(symbol),
+        "sentiment": lambda: sentiment.calculate_sentiment_score(news_api_key, query or symbol, incremental=incremental),
+        "impact": lambda: impact.calculate_impact_score(symbol),
+    }
+
+def store_result(name, result, scores, errors):
+    # The tools report recoverable failures (bad keys, rate limits) as text meant for the agent
+    if isinstance(result, str):
+        errors[name] = result.strip()
+    elif not isfinite(result):
+        # A NaN score would silently become AVOID / PASS, and cannot be stored in the run history
+        errors[name] = f"Non-finite score: {result}"
+    else:
+        scores[name] = result
+
+def gather_scores(symbol, news_api_key, alpha_api_key, query=None, timeouts=TOOL_TIMEOUTS, incremental=False):
+    calls = scoring_calls(symbol, news_api_key, alpha_api_key, query, incremental)
+    scores = {}
+    errors = {}
+
+    executor = ThreadPoolExecutor(max_workers=len(calls))
+    start = monotonic()
+    futures = {name: executor.submit(call) for name, call in calls.items()}
+    for name, future in futures.items():
+        remaining = max(timeouts[name] - (monotonic() - start), 0)
+        try:
+            result = future.result(timeout=remaining)
+        except TimeoutError:
+            errors[name] = f"Timed out after {timeouts[name]} seconds"
+            continue
+        except Exception as error:
+            errors[name] = repr(error)
+            continue
+        store_result(name, result, scores, errors)
+
+    # A timed out tool cannot be interrupted, so leave it to finish in the background rather than wait on it
+    executor.shutdown(wait=False, cancel_futures=True)
+    return scores, errors
+
+def run_symbol(symbol, news_api_key, alpha_api_key, query=None, timeouts=TOOL_TIMEOUTS, incremental=False):
+    scores, errors = gather_scores(symbol, news_api_key, alpha_api_key, query, timeouts, incremental)
+    result = {
+        "symbol": symbol,
+        "scores": scores,
+        "errors": errors,
+        "recommendation": None,
+        "evaluation": None,
+    }
+    if errors:
+        return result
+
+    arguments = {f"{name}_score": score for name, score in scores.items()}
+    result["recommendation"] = commander.make_reccomendation(**arguments)
+    result["evaluation"] = evaluator.check_logic(**arguments, recommendation=result["recommendation"])
+    return result
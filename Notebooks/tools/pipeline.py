@@ -0,0 +1,97 @@
+from math import isfinite
+from textwrap import dedent
+
+from . import history
+from .commander import (
+    BUY_THRESHOLD, HOLD_THRESHOLD, IMPACT_WEIGHT, PERFORMANCE_WEIGHT, RISK_WEIGHT, SENTIMENT_WEIGHT,
+    calculate_final_scores, classify_scores,
+)
+from .errors import RecommendationError
+from .evaluator import evaluate
+from .orchestration import TOOL_TIMEOUTS, gather_scores, scoring_calls, store_result
+
+""" Mission: Produce a recommendation for a symbol without an LLM in the loop.
+Techniques:
+    Scoring tools -> calculate_final_scores -> classify_scores -> evaluate, called directly as Python functions.
+    The weights and thresholds are the latest saved by the optimizer (tools.history), not Commander's constants.
+    Scores can be gathered in parallel (orchestration) or sequentially for fully reproducible batch runs.
+    Every completed recommendation is recorded in the run history store.
+    An LLM is only used, optionally, to narrate the finished result.
+Output: Dictionary of scores, final score, verdict (BUY / HOLD / AVOID) and evaluation (PASS / FAIL)
+"""
+
+SCORE_NAMES = ["performance", "risk", "sentiment", "impact"]
+
+def score_sequentially(symbol, news_api_key, alpha_api_key, query=None, incremental=False):
+    scores = {}
+    errors = {}
+    for name, call in scoring_calls(symbol, news_api_key, alpha_api_key, query, incremental).items():
+        try:
+            result = call()
+        except Exception as error:
+            errors[name] = repr(error)
+            continue
+        store_result(name, result, scores, errors)
+    return scores, errors
+
+def current_weights():
+    # Commander's constants only apply until a set of weights has been saved (the store seeds one on first use)
+    weights = history.latest_weights()
+    if weights is None:
+        return (PERFORMANCE_WEIGHT, RISK_WEIGHT, SENTIMENT_WEIGHT, IMPACT_WEIGHT, BUY_THRESHOLD, HOLD_THRESHOLD)
+    return weights
+
+def recommend_from_scores(performance_score, risk_score, sentiment_score, impact_score, weights=None):
+    weights = current_weights() if weights is None else weights
+    final_score = calculate_final_scores(performance_score, risk_score, sentiment_score, impact_score, weights=weights[:4]).item()
+    verdict = str(classify_scores(final_score, *weights[4:]))
+    return {
+        "scores": {
+            "performance": performance_score,
+            "risk": risk_score,
+            "sentiment": sentiment_score,
+            "impact": impact_score,
+        },
+        "final_score": final_score,
+        "verdict": verdict,
+        "evaluation": evaluate(performance_score, risk_score, sentiment_score, impact_score, verdict),
+    }
+
+def recommend(symbol, news_api_key, alpha_api_key, query=None, parallel=True, timeouts=TOOL_TIMEOUTS, record=True, incremental=False):
+    if parallel:
+        scores, errors = gather_scores(symbol, news_api_key, alpha_api_key, query, timeouts, incremental)
+    else:
+        scores, errors = score_sequentially(symbol, news_api_key, alpha_api_key, query, incremental)
+
+    if errors:
+        return {
+            "symbol": symbol,
+            "scores": scores,
+            "final_score": None,
+            "verdict": None,
+            "evaluation": None,
+            "errors": errors,
+        }
+
+    result = {"symbol": symbol, **recommend_from_scores(*(scores[name] for name in SCORE_NAMES)), "errors": {}}
+    if record:
+        # The history columns are NOT NULL; a NaN would be bound as NULL and fail the insert
+        if not all(isfinite(value) for value in [*result["scores"].values(), result["final_score"]]):
+            raise RecommendationError(f"Refusing to record non-finite scores for {symbol}: {result['scores']}")
+        history.record_run(result)
+    return result
+
+def narrative_prompt(result):
+    if result["verdict"] is None:
+        raise RecommendationError
+    scores = ", ".join(f"{name} {score:.3f}" for name, score in result["scores"].items())
+    return dedent(f"""
+                  Write a short investment note for {result["symbol"]}.  The team's scores were: {scores}.
+                  The weighted final score is {result["final_score"]:.3f}, giving a recommendation of {result["verdict"]},
+                  and the evaluator's audit of that recommendation returned {result["evaluation"]}.
+                  Explain the recommendation in plain language without changing it.
+                  """)
+
+def narrate(result, model):
+    message = model.generate([{"role": "user", "content": [{"type": "text", "text": narrative_prompt(result)}]}])
+    return message.content
@@ -1,8 +1,9 @@
-from sys import modules
+import numpy as np
+
 from smolagents import tool
-from yfinance import download
 
-from .utils import get_tool_names
+from .market_data import get_history
+from .utils import get_tools, register_tool
 
 """ Author: Tadhbir Singh
 Mission: Measure risk, volatility, and downside probability.
@@ -17,6 +18,109 @@ Techniques:
 Output: Risk Score (lower = safer)
 """
 
+# Hyperparameters
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.0
+BENCHMARK = "SPY"
+SIMULATION_PATHS = 10_000
+SIMULATION_HORIZON = 10
+CONFIDENCE = 0.95
+SIMULATION_SEED = 520
+MAX_SIMULATION_BYTES = 256 * 2**20
+
+def aligned_closes(symbols, period="1y"):
+    # One row per symbol on the union of their trading dates; dates a symbol did not trade are NaN
+    histories = [get_history(symbol, period) for symbol in symbols]
+    dates = np.unique(np.concatenate([history["Date"] for history in histories]))
+    closes = np.full((len(symbols), len(dates)), np.nan)
+    for row, history in enumerate(histories):
+        closes[row, np.searchsorted(dates, history["Date"])] = history["Close"]
+    return dates, closes
+
+def return_matrix(closes):
+    closes = np.atleast_2d(closes)
+    return closes[:, 1:] / closes[:, :-1] - 1
+
+def mean_downside(returns):
+    downside = np.where(returns < 0, returns, np.nan)
+    counts = np.sum(~np.isnan(downside), axis=1)
+    totals = np.nansum(downside, axis=1)
+    return np.abs(np.divide(totals, counts, out=np.zeros(len(totals)), where=counts > 0))
+
+def downside_deviation(returns, target=0.0):
+    shortfall = np.minimum(returns - target, 0)
+    return np.sqrt(np.nanmean(shortfall ** 2, axis=1))
+
+def sharpe_ratio(returns, risk_free_rate=RISK_FREE_RATE):
+    excess = returns - risk_free_rate / TRADING_DAYS
+    return np.nanmean(excess, axis=1) / np.nanstd(excess, axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+
+def beta(returns, benchmark_returns):
+    # Only days where both the symbol and the benchmark traded count towards the covariance
+    benchmark_returns = np.broadcast_to(benchmark_returns, returns.shape)
+    valid = ~(np.isnan(returns) | np.isnan(benchmark_returns))
+    counts = valid.sum(axis=1)
+    symbol = np.where(valid, returns, 0.0)
+    market = np.where(valid, benchmark_returns, 0.0)
+    symbol_centered = np.where(valid, symbol - symbol.sum(axis=1, keepdims=True) / counts[:, None], 0.0)
+    market_centered = np.where(valid, market - market.sum(axis=1, keepdims=True) / counts[:, None], 0.0)
+    return (symbol_centered * market_centered).sum(axis=1) / (market_centered ** 2).sum(axis=1)
+
+def monte_carlo_var(
+    returns,
+    paths=SIMULATION_PATHS,
+    horizon=SIMULATION_HORIZON,
+    confidence=CONFIDENCE,
+    seed=SIMULATION_SEED,
+    max_bytes=MAX_SIMULATION_BYTES,
+):
+    # Bootstrap horizon-day paths from each symbol's own daily log returns (missing days count as flat)
+    log_returns = np.log1p(np.nan_to_num(np.atleast_2d(returns)))
+    symbols, days = log_returns.shape
+
+    # Every symbol replays the same sampled days, which keeps cross-asset correlation and makes the result
+    # independent of how the work is chunked below
+    sampled_days = np.random.default_rng(seed).integers(0, days, size=(paths, horizon))
+
+    value_at_risk = np.empty(symbols)
+    conditional_value_at_risk = np.empty(symbols)
+    symbols_per_chunk = max(1, (max_bytes // 2) // (paths * 8))
+    for first_symbol in range(0, symbols, symbols_per_chunk):
+        block = log_returns[first_symbol:first_symbol + symbols_per_chunk]
+        terminal = np.empty((len(block), paths))
+        # The gathered (block, paths, horizon) days and their sums share the other half of the budget
+        paths_per_chunk = max(1, (max_bytes // 2) // (len(block) * (horizon + 1) * 8))
+        for first_path in range(0, paths, paths_per_chunk):
+            chunk = sampled_days[first_path:first_path + paths_per_chunk]
+            terminal[:, first_path:first_path + len(chunk)] = block[:, chunk].sum(axis=2)
+        # terminal is the only full-size array: everything below works in place or through a boolean mask, so peak
+        # memory stays near max_bytes (overwrite_input reorders each row, which the per-row sums do not care about)
+        np.expm1(terminal, out=terminal)
+
+        cutoff = np.quantile(terminal, 1 - confidence, axis=1, overwrite_input=True)
+        tail = terminal <= cutoff[:, None]
+        rows = slice(first_symbol, first_symbol + len(block))
+        value_at_risk[rows] = -cutoff
+        conditional_value_at_risk[rows] = -terminal.sum(axis=1, where=tail) / tail.sum(axis=1)
+
+    return value_at_risk, conditional_value_at_risk
+
+def calculate_risk_metrics(symbols, benchmark=BENCHMARK, period="1y"):
+    _, closes = aligned_closes([*symbols, benchmark], period)
+    returns = return_matrix(closes)
+    symbol_returns, benchmark_returns = returns[:-1], returns[-1]
+    value_at_risk, conditional_value_at_risk = monte_carlo_var(symbol_returns)
+    return {
+        "symbols": list(symbols),
+        "mean_downside": mean_downside(symbol_returns),
+        "downside_deviation": downside_deviation(symbol_returns),
+        "sharpe": sharpe_ratio(symbol_returns),
+        "beta": beta(symbol_returns, benchmark_returns),
+        "value_at_risk": value_at_risk,
+        "conditional_value_at_risk": conditional_value_at_risk,
+    }
+
+@register_tool
 @tool
 def calculate_risk(symbol:str) -> float:
     """Calculate a risk score based on downside deviation.
@@ -27,12 +131,9 @@ def calculate_risk(symbol:str) -> float:
     Returns:
         Float: The risk score.
     """
-    data = download(symbol, period="1y", progress=False)
-    data["Return"] = data["Close"].pct_change()
-    downside = data[data["Return"] < 0]["Return"]
-    risk_score = abs(downside.mean()) if not downside.empty else 0
-    return min(round(risk_score.item(), 3), 1)
+    returns = return_matrix(get_history(symbol, period="1y")["Close"])
+    risk_score = mean_downside(returns)[0]
+    return min(round(float(risk_score), 3), 1)
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
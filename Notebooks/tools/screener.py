@@ -0,0 +1,75 @@
+import json
+import warnings
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .forecast import retrain_if_stale
+from .pipeline import recommend
+from .utils import CACHE_DIR
+
+""" Mission: Screen a whole watchlist and stream a recommendation for every symbol as soon as it is ready.
+Techniques:
+    Symbols are spread over a bounded thread pool; each worker scores one symbol at a time.
+    External calls share the per-API budgets in tools.limits (Alpha Vantage, NewsAPI, Yahoo), however many workers run.
+    With incremental=True, sentiment only scores articles published since the symbol's last screen.
+    Before dispatch, a stale (or missing) global DeepAR model is retrained on the whole watchlist, so every worker's
+    forecast only runs inference.
+    Every finished symbol is appended to a JSON-lines checkpoint, so an interrupted screen resumes where it stopped.
+Output: Generator of recommendation dictionaries (BUY / HOLD / AVOID) in completion order
+"""
+
+# Hyperparameters
+MAX_WORKERS = 8
+CHECKPOINT_DIR = CACHE_DIR / "screens"
+
+def load_checkpoint(path):
+    finished = {}
+    if path.exists():
+        for line in path.read_text().splitlines():
+            if line.strip():
+                result = json.loads(line)
+                finished[result["symbol"]] = result
+    return finished
+
+def screen_symbol(symbol, news_api_key, alpha_api_key, query, incremental=False):
+    try:
+        return recommend(symbol, news_api_key, alpha_api_key, query=query, parallel=False, incremental=incremental)
+    except Exception as error:
+        return {"symbol": symbol, "verdict": None, "errors": {"screener": repr(error)}}
+
+def screen(symbols, news_api_key, alpha_api_key, name="watchlist", queries=None, max_workers=MAX_WORKERS, resume=True, incremental=False, retrain_forecast=True):
+    queries = queries or {}
+    checkpoint_path = CHECKPOINT_DIR / f"{name}.jsonl"
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    if not resume:
+        checkpoint_path.unlink(missing_ok=True)
+
+    finished = load_checkpoint(checkpoint_path)
+    pending = [symbol for symbol in dict.fromkeys(symbols) if symbol not in finished]
+    if pending and retrain_forecast:
+        try:
+            retrain_if_stale(alpha_api_key, list(dict.fromkeys(symbols)))
+        except Exception as error:
+            # Workers fall back to per-symbol models, so a failed retrain slows the screen down but does not stop it
+            warnings.warn(f"Could not retrain the global forecast model: {error!r}", stacklevel=2)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        with open(checkpoint_path, "a") as checkpoint:
+            futures = [
+                executor.submit(screen_symbol, symbol, news_api_key, alpha_api_key, queries.get(symbol), incremental)
+                for symbol in pending
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                # Only completed recommendations are checkpointed; failed symbols are retried on the next run
+                if not result["errors"]:
+                    checkpoint.write(json.dumps(result, default=float) + "\n")
+                    checkpoint.flush()
+                yield result
+    finally:
+        # If the caller stops early, drop the queued symbols instead of waiting for them
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def screen_results(name="watchlist"):
+    return load_checkpoint(CHECKPOINT_DIR / f"{name}.jsonl")
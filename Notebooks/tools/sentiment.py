@@ -1,16 +1,19 @@
+import numpy as np
 import pandas as pd
 
-from bs4 import BeautifulSoup
-from datetime import date, timedelta
-from requests import get
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 from smolagents import tool
-from sys import modules
 from textwrap import dedent
-from transformers import pipeline
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from threading import Lock
 
-from .utils import get_tool_names
-from .errors import NewsResponseError, TimeFrameError, YahooResponseError
+from . import history
+from .article_cache import classify_with_cache, get_or_fetch
+from .dedup import DuplicateIndex, article_groups, article_text, group_counts
+from .fetch import HEADERS, fetch, run_concurrently
+from .instrument import count, stage
+from .utils import get_tools, register_tool
+from .errors import NewsResponseError, NoArticlesError, TimeFrameError, YahooResponseError
 
 """ Author: Johnathan Kelsey
 Mission: Gauge market mood through news and media sentiment.
@@ -22,13 +25,30 @@ Tools & Libraries:
     BeautifulSoup (to parse news content)
     transformers (for FinBERT model)
 Techniques:
+    NewsAPI result pages are streamed and scored in fixed-size chunks, so memory stays flat however many articles are pulled.
+    Near-duplicate (syndicated) articles are grouped with MinHash/LSH on their headline (title + description) and,
+    when one could be fetched, their body. Groups span the whole result set: one DuplicateIndex is carried across
+    scoring chunks, and incremental runs store each article's signatures so copies from earlier runs are matched too.
+    FinBERT only sees one copy per group, and with COUNT_DUPLICATES_ONCE each group carries the weight of a single
+    article in the mean.
+    One VADER analyzer is shared by every call, and compound scores are memoized for repeated (syndicated) headlines.
     Text extraction, sentiment polarity scoring, and aggregation of scores from -1 (bearish) to +1 (bullish).
+    Incremental mode stores each article's score and only scores articles newer than the query's last run;
+    stored scores are combined with an exponential time decay (HALF_LIFE_DAYS).
 Output: Sentiment Score (-1 to +1)
 """
 
 # Hyperparameters
 VADER_WEIGHT = 1.0
 BERT_WEIGHT = 0.2
+HALF_LIFE_DAYS = 7.0
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+ARTICLE_LIMIT = 25
+PAGE_SIZE = 100
+SCORING_CHUNK_SIZE = 32
+NEWS_COLUMNS = ["title", "description", "url", "publishedAt"]
+VADER_CACHE_SIZE = 4096
+COUNT_DUPLICATES_ONCE = True
 
 def calculate_from_date(timeframe):
     current_date = date.today()
@@ -46,26 +66,52 @@ def calculate_from_date(timeframe):
     else:
         raise ValueError
 
-def call_news_api(api_key, query, timeframe):
+@stage("sentiment.fetch_news_page")
+def fetch_news_page(params):
+    # Single point of contact with NewsAPI - swap this out to replay recorded responses
+    response = fetch(NEWS_API_URL, params=params)
+    if response.status_code != 200:
+        raise NewsResponseError
+    return response.json()
+
+def stream_news_articles(api_key, query, timeframe, since=None, limit=ARTICLE_LIMIT, sort_by="relevancy"):
     try:
         from_date = calculate_from_date(timeframe)
     except ValueError:
         raise TimeFrameError
-    url = ("https://newsapi.org/v2/everything?"
-        f"q={query}&"
-        f"from={from_date}&"
-        "language=en&"
-        "sortBy=relevancy&"
-        f"apiKey={api_key}")
-    response = get(url)
-    if response.status_code != 200:
-        raise NewsResponseError
-    top_25 = response.json()["articles"][:25]
+    if since is not None:
+        # Incremental runs only ask for articles published after the last one already scored
+        from_date = max(since, datetime.combine(from_date, datetime.min.time())).isoformat(timespec="seconds")
+    params = {
+        "q": query,
+        "from": str(from_date),
+        "language": "en",
+        "sortBy": sort_by,
+        "pageSize": PAGE_SIZE if limit is None else min(PAGE_SIZE, limit),
+        "apiKey": api_key,
+    }
+
+    yielded = 0
+    page = 1
+    # limit=None pages until NewsAPI has nothing more to return
+    while limit is None or yielded < limit:
+        try:
+            body = fetch_news_page({**params, "page": page})
+        except NewsResponseError:
+            # Only a failure on the first page is an error; later pages can hit the plan's result cap
+            if page == 1:
+                raise
+            return
+        articles = body["articles"][:None if limit is None else limit - yielded]
+        yield from articles
+        yielded += len(articles)
+        if not articles or page * params["pageSize"] >= body.get("totalResults", 0):
+            return
+        page += 1
 
-    news_df = pd.DataFrame(columns=["title", "description", "url"])
-    for article in top_25:
-        news_df.loc[len(news_df)] = [article["title"], article["description"], article["url"]]
-    return news_df
+def call_news_api(api_key, query, timeframe, since=None, limit=ARTICLE_LIMIT, sort_by="relevancy"):
+    articles = list(stream_news_articles(api_key, query, timeframe, since, limit, sort_by))
+    return pd.DataFrame({column: [article[column] for article in articles] for column in NEWS_COLUMNS}, columns=NEWS_COLUMNS)
 
 def call_yfinance_api():
     # Optional addition - Use Search feature for additional News Urls to boost sentiment analysis
@@ -76,76 +122,171 @@ def call_edgar_api():
     # Optional addition - pull up most recent filing and analyze for sentiment as well
     pass
 
+_analyzer_lock = Lock()
+_analyzer = None
+
+def get_analyzer():
+    # Loading the VADER lexicon costs more than scoring, so it is only done once per process
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            _analyzer = SentimentIntensityAnalyzer()
+        return _analyzer
+
+@lru_cache(maxsize=VADER_CACHE_SIZE)
+def compound_score(sentence):
+    return get_analyzer().polarity_scores(sentence)["compound"]
+
+def score_many(sentences):
+    # Missing descriptions (NewsAPI returns null for some) are treated as neutral
+    compound_scores = np.array([compound_score(sentence or "") for sentence in sentences], dtype=np.float64)
+    return np.where(compound_scores >= 0.5, 1, np.where(compound_scores > -0.5, 0, -1))
+
 def calculate_VADER_score(sentence):
-    analyzer = SentimentIntensityAnalyzer()
-    polarity_scores = analyzer.polarity_scores(sentence)
-    compound_score = polarity_scores["compound"]
-    if compound_score >= 0.5:
-        return 1
-    if compound_score > -0.5:
-        return 0
-    return -1
+    return score_many([sentence])[0].item()
 
 def parse_yahoo_finance(url, headers):
-    response = get(url, headers=headers)
+    response = fetch(url, headers=headers)
     if response.status_code != 200:
-        raise YahooResponseError
+        raise YahooResponseError(response.status_code)
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(response.text, "html.parser")
 
     parts = soup.find_all("p", class_="yf-1090901")
     full_article = [part.get_text() for part in parts]
     return full_article
 
+@stage("sentiment.fetch_article")
 def fetch_article(url):
-    headers = {
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0"
-    }
-
     # Seperate parser required for every host - TODO: add more parsers
     if "finance.yahoo.com" in url:
-        return parse_yahoo_finance(url, headers)
+        return get_or_fetch(url, lambda url: parse_yahoo_finance(url, HEADERS))
     return None
 
-def calculate_BERT_score(pipe, article):
-    bert_df = pd.DataFrame(pipe(article))
-    sentiment = bert_df.label.value_counts().nlargest(1).index[0]
-    if sentiment == "positive":
-        return 1
-    if sentiment == "neutral":
-        return 0
-    return -1
-
-def calculate_sentiment_scores(dataframe, pipe):
-    vader_score = calculate_VADER_score(dataframe["description"])
-    article = fetch_article(dataframe["url"])
-    bert_score = calculate_BERT_score(pipe, article) if article else 0
-    combined_score = (vader_score * VADER_WEIGHT + bert_score * BERT_WEIGHT) / (VADER_WEIGHT + BERT_WEIGHT)
-    return combined_score
+def fetch_articles(urls):
+    return run_concurrently(fetch_article, urls)
+
+@stage("sentiment.calculate_BERT_score")
+def calculate_BERT_score(articles, groups=None, labels=None):
+    # groups hold each article's group root, which may belong to an earlier chunk; labels maps roots already classified.
+    # Each remaining group is classified once, from its first article with a body, and its label goes to the whole group
+    if groups is None:
+        groups = article_groups(articles)
+    labels = {} if labels is None else labels
+    representatives = {}
+    for position, group in enumerate(np.asarray(groups).tolist()):
+        if group not in labels and (group not in representatives or not articles[representatives[group]]):
+            representatives[group] = position
+    count("duplicates_collapsed", len(groups) - len(representatives))
+    labels.update(zip(representatives, classify_with_cache([articles[position] for position in representatives.values()])))
+    return np.array([labels[group] for group in np.asarray(groups).tolist()], dtype=int)
 
+def headline_text(article):
+    return " ".join(part for part in (article.get("title"), article.get("description")) if part)
+
+def duplicate_weights(groups):
+    return 1 / group_counts(groups) if COUNT_DUPLICATES_ONCE else np.ones(len(groups))
+
+def score_chunk(articles, index, labels):
+    vader_scores = score_many([article["description"] for article in articles])
+    bodies = fetch_articles([article["url"] for article in articles])
+    start = index.add([headline_text(article) for article in articles], [article_text(body) for body in bodies])
+    bert_scores = calculate_BERT_score(bodies, index.groups()[start:], labels)
+    return (vader_scores * VADER_WEIGHT + bert_scores * BERT_WEIGHT) / (VADER_WEIGHT + BERT_WEIGHT)
+
+def calculate_sentiment_scores(dataframe):
+    return np.concatenate([np.zeros(0), *stream_sentiment_scores(dataframe.to_dict("records"))])
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stream_sentiment_scores(articles, chunk_size=SCORING_CHUNK_SIZE, index=None):
+    # One index across every chunk, so a copy is matched against the whole result set and not just its own chunk
+    index = DuplicateIndex() if index is None else index
+    labels = {}
+    for chunk in chunked(articles, chunk_size):
+        yield score_chunk(chunk, index, labels)
+
+def mean_streamed_score(articles, chunk_size=SCORING_CHUNK_SIZE):
+    # Only a score per article is kept; weights are settled once every copy has been seen
+    index = DuplicateIndex()
+    scores = list(stream_sentiment_scores(articles, chunk_size, index))
+    if not scores:
+        raise NoArticlesError
+    weights = duplicate_weights(index.groups())
+    return (np.concatenate(scores) * weights).sum() / weights.sum()
+
+def published_timestamp(published_at):
+    return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+
+def calculate_incremental_sentiment(news_api_key, query, timeframe):
+    watermark = history.sentiment_watermark(query)
+    since = datetime.fromtimestamp(watermark, timezone.utc).replace(tzinfo=None) if watermark is not None else None
+    # The watermark moves to the newest article scored, so the whole delta has to be scored: a top-N by relevancy would
+    # leave the rest below the new watermark for good. Pages run until NewsAPI has nothing more (or its plan cap ends them).
+    news_df = call_news_api(news_api_key, query, timeframe, since=since, limit=None, sort_by="publishedAt")
+
+    published = np.array([published_timestamp(value) for value in news_df["publishedAt"]])
+    is_new = published > watermark if watermark is not None else np.ones(len(published), dtype=bool)
+    window_start = datetime.combine(calculate_from_date(timeframe), datetime.min.time(), timezone.utc).timestamp()
+    if is_new.any():
+        # Group new articles against the stored window as well, so a copy of an earlier story shares its label
+        index = DuplicateIndex()
+        _, *stored_signatures = history.article_scores(query, window_start)
+        start = index.add_signatures(*stored_signatures)
+        new_df = news_df[is_new]
+        scores = np.concatenate(list(stream_sentiment_scores(new_df.to_dict("records"), index=index)))
+        history.record_article_scores(query, zip(new_df["url"], published[is_new], scores, *index.signatures_from(start)))
+
+    # Combine stored and new scores from the window, weighting each article by how recently it was published and,
+    # like the streamed path, by its share of its near-duplicate group across the whole window
+    stored, *stored_signatures = history.article_scores(query, window_start)
+    if not len(stored):
+        raise NoArticlesError
+    index = DuplicateIndex()
+    index.add_signatures(*stored_signatures)
+    age_days = (datetime.now(timezone.utc).timestamp() - stored[:, 0]) / (24 * 60 * 60)
+    weights = 0.5 ** (np.maximum(age_days, 0) / HALF_LIFE_DAYS) * duplicate_weights(index.groups())
+    return (weights * stored[:, 1]).sum() / weights.sum()
+
+@register_tool
 @tool
-def calculate_sentiment_score(news_api_key:str, query:str, timeframe:str = "30d") -> float:
+def calculate_sentiment_score(news_api_key:str, query:str, timeframe:str = "30d", incremental:bool = False, limit:int = 25) -> float:
     """Calculate a sentiment score from news articles related to the financial instrument in question.
 
     Args:
         news_api_key (str): NewsAPI key used to pull articles from NewsAPI.
         query (str): The keyword(s) used to query NewsAPI.
         timeframe (str): Time period to look back - default: 30 days.
+        incremental (bool): Only score articles published since the last run for this query and blend them with stored scores, weighted towards recent articles - default: False.
+        limit (int): Maximum number of articles to pull from NewsAPI - default: 25.  Ignored in incremental mode, which scores every article published since the last run.
 
     Returns:
         Float: The mean value of the sentiment classifications for all articles analyzed.
     """
-    pipe = pipeline("text-classification", model="ProsusAI/finbert", max_length=512, truncation=True)
     try:
-        news_df = call_news_api(news_api_key, query, timeframe)
-        scores_df = news_df.apply(lambda df: calculate_sentiment_scores(df, pipe), axis=1)
-        return (scores_df.sum() / len(scores_df)).item()
+        if incremental:
+            return calculate_incremental_sentiment(news_api_key, query, timeframe).item()
+        return float(mean_streamed_score(stream_news_articles(news_api_key, query, timeframe, limit=limit)))
 
     except NewsResponseError:
         return dedent("""
                       NewsAPI returned an error.  The most likely cause is a bad API key.  You need to have a valid NewsAPI key stored as an environmental
                       variable.  Make sure to pass that variable to the tool so that it can be used in the get request.
                       """)
+    except NoArticlesError:
+        return dedent("""
+                      NewsAPI did not return any articles for this query and timeframe, so there is nothing to score.  Try a broader query
+                      (for example the company name instead of the symbol) or a longer timeframe.
+                      """)
     except TimeFrameError:
         return dedent("""
                       There is an issue with your parameter `timeframe`. It must be in the format `10d` where `10` is the quantity and `d` is the period.
@@ -158,5 +299,4 @@ def calculate_sentiment_score(news_api_key:str, query:str, timeframe:str = "30d"
                       """)
 
 # Map tools for easy export
-self = modules[__name__]
-self.__dict__["tools"] = [self.__dict__[tool_name] for tool_name in list(get_tool_names(self))]
\ No newline at end of file
+tools = get_tools(__name__)
@@ -0,0 +1,43 @@
+import numpy as np
+
+""" Mission: Score long-term price direction for many symbols and periods at once.
+Techniques:
+    Closed-form least squares (slope of Close on Open) from cumulative sums over a symbols x time price matrix.
+    Each period is a trailing window, so all periods come from one set of reverse cumulative sums.
+    Prices are centred on each symbol's mean first so the sums stay numerically stable.
+Output: Slope coefficients per symbol and period, or their mean per symbol
+"""
+
+def trailing_sums(values):
+    # sums[:, i] holds the sum of values[:, i:] for every row
+    return np.cumsum(values[:, ::-1], axis=1)[:, ::-1]
+
+def regression_slopes(opens, closes, starts):
+    opens = np.atleast_2d(np.asarray(opens, dtype=np.float64))
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    starts = np.asarray(starts)
+
+    # Missing bars (NaN, e.g. padding for shorter histories) are left out of every sum
+    valid = ~(np.isnan(opens) | np.isnan(closes))
+    counts = trailing_sums(valid.astype(np.float64))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.where(valid, opens - np.nanmean(np.where(valid, opens, np.nan), axis=1, keepdims=True), 0.0)
+        y = np.where(valid, closes - np.nanmean(np.where(valid, closes, np.nan), axis=1, keepdims=True), 0.0)
+
+    sum_x = trailing_sums(x)
+    sum_y = trailing_sums(y)
+    sum_xx = trailing_sums(x * x)
+    sum_xy = trailing_sums(x * y)
+
+    # starts may be one index for every symbol, or one row of indices per symbol
+    if starts.ndim == 1:
+        starts = np.broadcast_to(starts, (opens.shape[0], starts.size))
+    rows = np.arange(opens.shape[0])[:, None]
+    n = counts[rows, starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = sum_xy[rows, starts] - sum_x[rows, starts] * sum_y[rows, starts] / n
+        variance = sum_xx[rows, starts] - sum_x[rows, starts] ** 2 / n
+        return covariance / variance
+
+def trend_scores(opens, closes, starts):
+    return regression_slopes(opens, closes, starts).mean(axis=1)
@@ -1,8 +1,28 @@
-from inspect import getsourcelines
+import sqlite3
 
+from pathlib import Path
 
-def get_tool_names(module):
-    source, *_ = getsourcelines(module)
-    for line_number, line in enumerate(source):
-        if line.strip() == "@tool":
-            yield source[line_number + 1].split()[1].split("(")[0]
\ No newline at end of file
+from .instrument import instrument_tools
+
+# Local caches and stores shared by the tools live beside the notebook
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
+
+# Exported tools per module, in definition order
+_tools = {}
+
+def register_tool(tool):
+    # Stacked above @tool: "@register_tool" then "@tool" then "def ..."
+    _tools.setdefault(tool.forward.__module__, []).extend(instrument_tools([tool]))
+    return tool
+
+def get_tools(module_name):
+    return list(_tools.get(module_name, []))
+
+def open_store(path, schema):
+    # One connection per store, shared across threads: callers serialize access with their module _lock.
+    # WAL lets other processes keep reading while this one writes
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(schema)
+    return connection